@@ -0,0 +1,1220 @@
+# zelda64-import-blender
+# Import models from Zelda64 files into Blender
+# Copyright (C) 2013 SoulofDeity
+# Copyright (C) 2020 Dragorn421
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>
+
+bl_info = {
+    "name":        "Zelda64 Importer",
+    "version":     (2, 5),
+    "author":      "SoulofDeity",
+    "blender":     (2, 6, 0),
+    "location":    "File > Import-Export",
+    "description": "Import Zelda64 - updated in 2020",
+    "warning":     "",
+    "wiki_url":    "https://github.com/Dragorn421/zelda64-import-blender",
+    "tracker_url": "https://github.com/Dragorn421/zelda64-import-blender",
+    "support":     'COMMUNITY',
+    "category":    "Import-Export"}
+
+"""Anim stuff: RodLima http://www.facebook.com/rod.lima.96?ref=tn_tnmn"""
+
+import bpy, os, struct, time
+import concurrent.futures
+import logging
+import mathutils
+import numpy
+
+from bpy import ops
+from bpy.props import *
+from bpy_extras.image_utils import load_image
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+from collections import OrderedDict
+from math import *
+from mathutils import *
+from struct import pack, unpack_from
+
+from mathutils import Vector, Euler, Matrix
+
+from . import core
+from .core import (
+    getLogger, logging_trace_level, registerLogging, setLoggingLevel, setLogFile, setLogOperator, unregisterLogging,
+    splitOffset, decodeTextureJob, getTextureCacheKey, TextureCache,
+)
+
+def translateRotation(rot):
+    """ axis, angle """
+    return Matrix.Rotation(rot[3], 4, Vector(rot[:3]))
+
+def getPoseQuaternions(rotations):
+    """
+    Pose bone rotation_quaternion (w, x, y, z) for each rotation in rotations, an array of (x, y, z) rotations as stored in animations
+    Bones are created pointing up, so the game x y z axes are the bone local x y z axes
+    and the game applying x then y then z is Euler((x, y, z), 'XYZ').to_quaternion()
+    """
+    half = numpy.asarray(rotations, dtype=numpy.float64) * (pi / 0x10000)
+    c, s = numpy.cos(half), numpy.sin(half)
+    cx, cy, cz = c[..., 0], c[..., 1], c[..., 2]
+    sx, sy, sz = s[..., 0], s[..., 1], s[..., 2]
+    return numpy.stack((
+        cy * cx * cz + sy * sx * sz,
+        cy * sx * cz - sy * cx * sz,
+        cy * sx * sz + sy * cx * cz,
+        cy * cx * sz - sy * sx * cz,
+    ), axis=-1)
+
+def addFCurve(action, dataPath, index, group, frames, values):
+    fcurve = action.fcurves.new(dataPath, index, group)
+    fcurve.keyframe_points.add(len(frames))
+    co = numpy.empty((len(frames), 2), dtype=numpy.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    fcurve.keyframe_points.foreach_set('co', co.ravel())
+    fcurve.update()
+    return fcurve
+
+def buildAnimation(animation, action, boneNames, scaleFactor):
+    """
+    Write the poses of a core.Animation as keyframes of action (frames 1 to the frame count), for bones named boneNames
+    """
+    log = getLogger('buildAnimation')
+    frames = len(animation.rotations)
+    if frames == 0:
+        return
+    keyFrames = numpy.arange(1, frames + 1, dtype=numpy.float32)
+    quaternions = getPoseQuaternions(animation.rotations)
+    for bIndx in range(min(len(boneNames), animation.rotations.shape[1])):
+        valid = animation.rotationsValid[:, bIndx]
+        if not valid.any():
+            log.trace('Bone %d is not animated', bIndx)
+            continue
+        boneQuaternions = quaternions[valid, bIndx]
+        # q and -q are the same rotation, keep consecutive keyframes in the same hemisphere so they interpolate the short way
+        signs = numpy.cumprod(numpy.where((boneQuaternions[1:] * boneQuaternions[:-1]).sum(axis=1) < 0, -1.0, 1.0))
+        boneQuaternions[1:] *= signs[:, numpy.newaxis]
+        dataPath = 'pose.bones["%s"].rotation_quaternion' % boneNames[bIndx]
+        for i in range(4):
+            addFCurve(action, dataPath, i, boneNames[bIndx], keyFrames[valid], boneQuaternions[:, i])
+    ## Translations
+    location = animation.rootLocation * scaleFactor
+    dataPath = 'pose.bones["%s"].location' % boneNames[0]
+    for i in range(3):
+        addFCurve(action, dataPath, i, boneNames[0], keyFrames, location[:, i])
+
+class PendingTexture:
+    def __init__(self, job, writeFile, fallbackPath):
+        self.job = job
+        self.cacheKey = None
+        self.tgaData = None
+        self.fromCache = False
+        self.write_error_encountered = False
+        self.writeFile = writeFile
+        self.fallbackPath = fallbackPath
+        self.images = []
+        # set once a mesh using the texture is created, unused textures are not decoded
+        self.used = False
+
+class TextureDecodeQueue:
+    """
+    Textures are decoded once all display lists have been read, so they can be decoded by several processes at once
+    Until then, materials use empty images which run() fills or makes use the written texture files
+    Only textures of materials used by created meshes are decoded, other materials are removed
+    """
+    def __init__(self, processes):
+        # 0 means as many processes as there are cpu cores
+        self.processes = processes
+        # texture file path (one per decoded image, see core.Tile.getMaterial) -> PendingTexture
+        self.textures = OrderedDict()
+        # material name -> (texture file path or None, material, texture, image) for materials no created mesh uses (yet)
+        self.unusedMaterials = {}
+
+    def __contains__(self, path):
+        return path in self.textures
+
+    def add(self, path, job, writeFile, fallbackPath):
+        self.textures[path] = PendingTexture(job, writeFile, fallbackPath)
+
+    def addImage(self, path, w, h):
+        img = bpy.data.images.new(os.path.basename(path), w, h, alpha=True)
+        self.textures[path].images.append(img)
+        return img
+
+    def addMaterial(self, path, mtl, tex, img):
+        """path is None if the texture isn't pending (image was loaded from an existing file)"""
+        self.unusedMaterials[mtl.name] = (path, mtl, tex, img)
+
+    def useMaterial(self, mtl):
+        entry = self.unusedMaterials.pop(mtl.name, None)
+        if entry and entry[0] is not None:
+            self.textures[entry[0]].used = True
+
+    def removeUnusedMaterials(self):
+        log = getLogger('TextureDecodeQueue.removeUnusedMaterials')
+        log.info('Removing %d materials not used by any mesh', len(self.unusedMaterials))
+        for path, mtl, tex, img in self.unusedMaterials.values():
+            if path is not None:
+                self.textures[path].images.remove(img)
+            bpy.data.materials.remove(mtl)
+            bpy.data.textures.remove(tex)
+            if img:
+                bpy.data.images.remove(img)
+        self.unusedMaterials.clear()
+        for path in [path for path, texture in self.textures.items() if not texture.used]:
+            log.trace('Not decoding unused texture %s', path)
+            del self.textures[path]
+
+    def decode(self, jobs):
+        log = getLogger('TextureDecodeQueue.decode')
+        processes = self.processes or os.cpu_count() or 1
+        if processes > 1 and len(jobs) > 1:
+            if os.name == 'nt':
+                # worker processes would have to import this module, which needs bpy
+                log.info('Decoding textures in several processes is not supported on Windows')
+            else:
+                try:
+                    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+                        return list(executor.map(decodeTextureJob, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+                except:
+                    log.exception('Failed to decode textures in other processes, decoding them in this process instead')
+        return [decodeTextureJob(job) for job in jobs]
+
+    def run(self):
+        log = getLogger('TextureDecodeQueue.run')
+        self.removeUnusedMaterials()
+        for texture in self.textures.values():
+            if textureCache:
+                texture.cacheKey = getTextureCacheKey(texture.job)
+                texture.tgaData = textureCache.get(texture.cacheKey)
+                texture.fromCache = texture.tgaData is not None
+        decoding = [texture for texture in self.textures.values() if texture.tgaData is None]
+        log.info('Decoding %d textures (%d more found in cache)', len(decoding), len(self.textures) - len(decoding))
+        for texture, (tgaData, write_error_encountered) in zip(decoding, self.decode([texture.job for texture in decoding])):
+            texture.tgaData = tgaData
+            texture.write_error_encountered = write_error_encountered
+        for path, texture in self.textures.items():
+            if texture.write_error_encountered:
+                log.warning('Writing failed texture file import to %s instead of %s', texture.fallbackPath, path)
+                path = texture.fallbackPath
+            elif texture.cacheKey and not texture.fromCache:
+                textureCache.put(texture.cacheKey, texture.tgaData)
+            fileExists = not texture.writeFile and os.path.isfile(path)
+            if texture.writeFile:
+                log.debug('Writing texture %s', path)
+                try:
+                    with open(path, 'wb') as file:
+                        file.write(texture.tgaData)
+                    fileExists = True
+                except:
+                    log.exception('Could not write texture file %s', path)
+            useFile = fileExists and (exportTextures or not createImagesInMemory)
+            for img in texture.images:
+                if createImagesInMemory or not useFile:
+                    try:
+                        self.fillImage(img, texture.tgaData)
+                    except:
+                        log.exception('Could not fill image %s from texture %s', img.name, path)
+                if useFile:
+                    img.filepath_raw = path
+                    img.source = 'FILE'
+        self.textures.clear()
+
+    def fillImage(self, img, tgaData):
+        """Set image pixels directly from tga data as made by Tile.encodeTGA, without going through a file"""
+        (   idLength, colorMapType, imageType,
+            firstEntry, palSize, entryBits,
+            x, y, width, height, depth, descriptor
+        ) = struct.unpack_from("<BBBHHBHHHHBB", tgaData)
+        if tuple(img.size) != (width, height):
+            getLogger('TextureDecodeQueue.fillImage').error('Image %s is %dx%d but its texture is %dx%d, not filling it', img.name, img.size[0], img.size[1], width, height)
+            return
+        data = numpy.frombuffer(tgaData, dtype=numpy.uint8, offset=18)
+        if colorMapType == 1:
+            palette = data[:palSize * 4].reshape(palSize, 4)
+            pixels = palette[data[palSize * 4:palSize * 4 + width * height]]
+        else:
+            pixels = data[:width * height * 4].reshape(width * height, 4)
+        # tga and blender images both start at the bottom left
+        pixels = pixels[:,(2,1,0,3)] / 255 # BGRA -> RGBA
+        img.pixels[:] = pixels.ravel().tolist()
+
+
+class SceneBuilder:
+    """
+    Creates the Blender data (armatures, materials, meshes, objects, actions) from what a core.F3DZEX read
+    """
+    def __init__(self, f3dzex):
+        self.f3dzex = f3dzex
+        self.prefix = f3dzex.prefix
+        # core.Hierarchy -> armature object
+        self.armatures = {}
+        # core.Material -> material, or None if it could not be created
+        self.materials = {}
+        # core.Mesh -> (mesh, vertex groups), see createMesh
+        self.meshes = {}
+
+    def build(self):
+        log = getLogger('SceneBuilder.build')
+        f3dzex = self.f3dzex
+        for hierarchy in f3dzex.hierarchy:
+            log.info("Creating armature '%s'..." % hierarchy.name)
+            self.createArmature(hierarchy)
+        for material in f3dzex.materials:
+            self.materials[material] = self.createMaterial(material)
+        log.info('Creating %d objects', len(f3dzex.objects))
+        for mesh in f3dzex.objects:
+            self.createObject(mesh)
+        for background in f3dzex.backgrounds:
+            self.createBackground(background)
+        if len(f3dzex.hierarchy) > 0:
+            self.buildAllAnimations()
+
+    def createArmature(self, hierarchy):
+        rx, ry, rz = 90,0,0
+        if (bpy.context.active_object):
+            bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+        for i in bpy.context.selected_objects:
+            i.select = False
+        armature = bpy.data.objects.new(hierarchy.name, bpy.data.armatures.new("%s_armature" % hierarchy.name))
+        self.armatures[hierarchy] = armature
+        armature.show_x_ray = True
+        armature.data.draw_type = 'STICK'
+        bpy.context.scene.objects.link(armature)
+        bpy.context.scene.objects.active = armature
+        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        boneNames = hierarchy.boneNames
+        for i in range(hierarchy.limbCount):
+            bone = armature.data.edit_bones.new(boneNames[i])
+            bone.use_deform = True
+            bone.head = hierarchy.limb[i].pos.tolist()
+
+        for i in range(hierarchy.limbCount):
+            bone = armature.data.edit_bones[boneNames[i]]
+            if (hierarchy.limb[i].parent != -1):
+                bone.parent = armature.data.edit_bones[boneNames[hierarchy.limb[i].parent]]
+                bone.use_connect = False
+            bone.tail = bone.head + Vector([0, 0, 0.0001])
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    def createMaterial(self, material):
+        log = getLogger('SceneBuilder.createMaterial')
+        path = material.texturePath
+        if exportTextures:
+            try:
+                os.mkdir(core.fpath + "/textures")
+            except FileExistsError:
+                pass
+            except:
+                log.exception('Could not create textures directory %s' % (core.fpath + "/textures"))
+                pass
+        try:
+            tex = bpy.data.textures.new(name=material.textureName, type='IMAGE')
+            if path in textureDecodeQueue:
+                img = textureDecodeQueue.addImage(path, material.width, material.height)
+            elif not createImagesInMemory and os.path.isfile(path):
+                img = load_image(path)
+            else:
+                textureDecodeQueue.add(
+                    path, material.decodeJob,
+                    exportTextures and not os.path.isfile(path),
+                    material.fallbackPath
+                )
+                img = textureDecodeQueue.addImage(path, material.width, material.height)
+            if img:
+                tex.image = img
+                if material.clip[0] & 2 != 0 and enableTexClampBlender:
+                    img.use_clamp_x = True
+                if material.clip[1] & 2 != 0 and enableTexClampBlender:
+                    img.use_clamp_y = True
+            mtl = bpy.data.materials.new(name=material.name)
+            if enableShadelessMaterials:
+                mtl.use_shadeless = True
+            mt = mtl.texture_slots.add()
+            mt.texture = tex
+            mt.texture_coords = 'UV'
+            mt.use_map_color_diffuse = True
+            if material.use_transparency:
+                mt.use_map_alpha = True
+                tex.use_mipmap = True
+                tex.use_interpolation = True
+                tex.use_alpha = True
+                mtl.use_transparency = True
+                mtl.alpha = 0.0
+                mtl.game_settings.alpha_blend = 'ALPHA'
+            textureDecodeQueue.addMaterial(
+                path if path in textureDecodeQueue else None,
+                mtl, tex, img)
+            return mtl
+        except:
+            log.exception('Failed to create material %s', material.name)
+            return None
+
+    def createMesh(self, mesh):
+        """
+        Mesh data from a core.Mesh, and the vertex groups of its objects (name -> vertex indices)
+        """
+        log = getLogger('SceneBuilder.createMesh')
+        nverts, nfaces, nmaterials = mesh.getSize()
+        log.trace('Creating mesh %s', mesh.name)
+
+        me = bpy.data.meshes.new(mesh.name)
+        me.vertices.add(nverts)
+        me.vertices.foreach_set('co', mesh.verts)
+        me.loops.add(nfaces * 3)
+        me.loops.foreach_set('vertex_index', mesh.faces)
+        me.polygons.add(nfaces)
+        me.polygons.foreach_set('loop_start', range(0, nfaces * 3, 3))
+        me.polygons.foreach_set('loop_total', (3,) * nfaces)
+        me.polygons.foreach_set('use_smooth', mesh.faces_use_smooth)
+
+        slots, faces_slot = mesh.getMaterialSlots()
+        materials = [self.materials.get(material) for material in slots]
+        for material in materials:
+            me.materials.append(material)
+            if material:
+                textureDecodeQueue.useMaterial(material)
+        me.polygons.foreach_set('material_index', faces_slot)
+
+        me.vertex_colors.new().data.foreach_set('color', mesh.colors)
+        uvt = me.uv_textures.new()
+        me.uv_layers[uvt.name].data.foreach_set('uv', mesh.uvs)
+        # images can't be set in bulk, only set them on textured faces
+        images = [material.texture_slots[0].texture.image if material else None for material in materials]
+        if any(images):
+            uvd = uvt.data
+            for i, slot in enumerate(faces_slot.tolist()):
+                if images[slot]:
+                    uvd[i].image = images[slot]
+
+        me.update(calc_edges=True)
+        me.validate()
+        me.update()
+
+        log.debug('me =\n%r', me)
+        log.debug('verts =\n%r', mesh.verts)
+        log.debug('faces =\n%r', mesh.faces)
+        log.debug('normals =\n%r', mesh.normals)
+
+        if mesh.use_normals:
+            # fixme duplicate faces make normal count not the loop count
+            loop_normals = [mesh.normals[i:i + 3] for i in range(0, len(mesh.normals), 3)]
+            me.use_auto_smooth = True
+            try:
+                me.normals_split_custom_set(loop_normals)
+            except:
+                log.exception('normals_split_custom_set failed, known issue due to duplicate faces')
+
+        vgroups = {}
+        if mesh.hierarchy:
+            boneNames = mesh.hierarchy.boneNames
+            vgroups = {boneNames[limb]: verts.tolist() for limb, verts in mesh.getVertexGroups().items()}
+        return me, vgroups
+
+    def createObject(self, mesh):
+        """
+        Link the mesh data of a core.Mesh in a new object, the mesh data is shared by objects of the same core.Mesh
+        """
+        if mesh not in self.meshes:
+            self.meshes[mesh] = self.createMesh(mesh)
+        me, vgroups = self.meshes[mesh]
+        ob = bpy.data.objects.new(mesh.ob_name, me)
+        bpy.context.scene.objects.link(ob)
+        bpy.context.scene.objects.active = ob
+        hierarchy = mesh.hierarchy
+        if hierarchy:
+            armature = self.armatures[hierarchy]
+            for name, vgroup in vgroups.items():
+                ob.vertex_groups.new(name).add(vgroup, 1.0, 'REPLACE')
+            ob.parent = armature
+            mod = ob.modifiers.new(hierarchy.name, 'ARMATURE')
+            mod.object = armature
+            mod.use_bone_envelopes = False
+            mod.use_vertex_groups = True
+            mod.show_in_editmode = True
+            mod.show_on_cage = True
+        return ob
+
+    def createBackground(self, background):
+        log = getLogger('SceneBuilder.createBackground')
+        try:
+            os.mkdir(core.fpath + '/textures')
+        except FileExistsError:
+            pass
+        except:
+            log.exception('Could not create textures directory %s' % (core.fpath + '/textures'))
+            pass
+        jfifPath = '%s/textures/%s' % (core.fpath, background.fileName)
+        with open(jfifPath, 'wb') as f:
+            f.write(background.jfifData)
+        log.info('Copied jfif image to %s', jfifPath)
+        jfifImage = load_image(jfifPath)
+        me = bpy.data.meshes.new(background.name)
+        me.vertices.add(4)
+        cos = (
+            (background.width, 0),
+            (0,                0),
+            (0,                background.height),
+            (background.width, background.height),
+        )
+        import bmesh
+        bm = bmesh.new()
+        transform = Matrix.Scale(core.scaleFactor, 4)
+        bm.faces.new(bm.verts.new(transform * Vector((cos[i][0], 0, cos[i][1]))) for i in range(4))
+        bm.to_mesh(me)
+        bm.free()
+        del bmesh
+        me.uv_textures.new().data[0].image = jfifImage
+        ob = bpy.data.objects.new(background.name, me)
+        ob.location.z = max(max(v.co.z for v in obj.data.vertices) for obj in bpy.context.scene.objects if obj.type == 'MESH')
+        ob.location.y -= core.scaleFactor * 100 * background.index
+        bpy.context.scene.objects.link(ob)
+        return ob
+
+    def LinkTpose(self, hierarchy):
+        log = getLogger('SceneBuilder.LinkTpose')
+        segment = []
+        data = self.f3dzex.segment[0x06]
+        segment = self.f3dzex.segment
+        RX, RY, RZ = 0,0,0
+        BoneCount  = hierarchy.limbCount
+        bpy.context.scene.tool_settings.use_keyframe_insert_auto = True
+        bonesIndx = [0,-90,0,0,0,0,0,0,0,90,0,0,0,180,0,0,-180,0,0,0,0]
+        bonesIndy = [0,90,0,0,0,90,0,0,90,-90,-90,-90,0,0,0,90,0,0,90,0,0]
+        bonesIndz = [0,0,0,0,0,0,0,0,0,0,0,0,0,-90,0,0,90,0,0,0,0]
+
+        log.info("Link T Pose...")
+        for i in range(BoneCount):
+            bIndx = ((BoneCount-1) - i)
+            if (i > -1):
+                bone = self.armatures[hierarchy].bones["limb_%02i" % (bIndx)]
+                bone.select = True
+                bpy.ops.transform.rotate(value = radians(bonesIndx[bIndx]), axis=(0, 0, 0), constraint_axis=(True, False, False))
+                bpy.ops.transform.rotate(value = radians(bonesIndz[bIndx]), axis=(0, 0, 0), constraint_axis=(False, False, True))
+                bpy.ops.transform.rotate(value = radians(bonesIndy[bIndx]), axis=(0, 0, 0), constraint_axis=(False, True, False))
+                bpy.ops.pose.select_all(action="DESELECT")
+
+        self.armatures[hierarchy].bones["limb_00"].select = True ## Translations
+        bpy.ops.transform.translate(value =(0, 0, 0), constraint_axis=(True, False, False))
+        bpy.ops.transform.translate(value = (0, 0, 50), constraint_axis=(False, False, True))
+        bpy.ops.transform.translate(value = (0, 0, 0), constraint_axis=(False, True, False))
+        bpy.ops.pose.select_all(action="DESELECT")
+        bpy.context.scene.tool_settings.use_keyframe_insert_auto = False
+
+        for i in range(BoneCount):
+            bIndx = i
+            if (i > -1):
+                bone = self.armatures[hierarchy].bones["limb_%02i" % (bIndx)]
+                bone.select = True
+                bpy.ops.transform.rotate(value = radians(-bonesIndy[bIndx]), axis=(0, 0, 0), constraint_axis=(False, True, False))
+                bpy.ops.transform.rotate(value = radians(-bonesIndz[bIndx]), axis=(0, 0, 0), constraint_axis=(False, False, True))
+                bpy.ops.transform.rotate(value = radians(-bonesIndx[bIndx]), axis=(0, 0, 0), constraint_axis=(True, False, False))
+                bpy.ops.pose.select_all(action="DESELECT")
+
+        self.armatures[hierarchy].bones["limb_00"].select = True ## Translations
+        bpy.ops.transform.translate(value =(0, 0, 0), constraint_axis=(True, False, False))
+        bpy.ops.transform.translate(value = (0, 0, -50), constraint_axis=(False, False, True))
+        bpy.ops.transform.translate(value = (0, 0, 0), constraint_axis=(False, True, False))
+        bpy.ops.pose.select_all(action="DESELECT")
+
+    def buildLinkAnimations(self, hierarchy, newframe):
+        global AnimtoPlay
+        global Animscount
+        log = getLogger('SceneBuilder.buildLinkAnimations')
+        # todo buildLinkAnimations hasn't been rewritten/improved like buildAnimation has
+        log.warning('The code to build link animations has not been improved/tested for a while, not sure what features it lacks compared to regular animations, pretty sure it will not import all animations')
+        segment = []
+        rot_indx = 0
+        rot_indy = 0
+        rot_indz = 0
+        data = self.f3dzex.segment[0x06]
+        segment = self.f3dzex.segment
+        n_anims = self.f3dzex.animTotal
+        seg, offset = splitOffset(hierarchy.offset)
+        BoneCount  = hierarchy.limbCount
+        RX, RY, RZ = 0,0,0
+        frameCurrent = newframe
+
+        if (AnimtoPlay > 0 and AnimtoPlay <= n_anims):
+          currentanim = AnimtoPlay - 1
+        else:
+          currentanim = 0
+
+        log.info("currentanim: %d frameCurrent: %d", currentanim+1, frameCurrent+1)
+        AnimationOffset = self.f3dzex.offsetAnims[currentanim]
+        TAnimationOffset = self.f3dzex.offsetAnims[currentanim]
+        AniSeg = AnimationOffset >> 24
+        AnimationOffset &= 0xFFFFFF
+        rot_offset = AnimationOffset
+        rot_offset += (frameCurrent * (BoneCount * 6 + 8))
+        frameTotal = self.f3dzex.animFrames[currentanim]
+        rot_offset += BoneCount * 6
+
+        Trot_offset = TAnimationOffset & 0xFFFFFF
+        Trot_offset += (frameCurrent * (BoneCount * 6 + 8))
+        TRX = unpack_from(">h", segment[AniSeg], Trot_offset)[0]
+        Trot_offset += 2
+        TRZ = unpack_from(">h", segment[AniSeg], Trot_offset)[0]
+        Trot_offset += 2
+        TRY = -unpack_from(">h", segment[AniSeg], Trot_offset)[0]
+        Trot_offset += 2
+        BoneListListOffset = unpack_from(">L", segment[seg], offset)[0]
+        BoneListListOffset &= 0xFFFFFF
+
+        BoneOffset = unpack_from(">L", segment[seg], BoneListListOffset + (0 << 2))[0]
+        S_Seg = (BoneOffset >> 24) & 0xFF
+        BoneOffset &= 0xFFFFFF
+        TRX += unpack_from(">h", segment[S_Seg], BoneOffset)[0]
+        TRZ += unpack_from(">h", segment[S_Seg], BoneOffset + 2)[0]
+        TRY += -unpack_from(">h", segment[S_Seg], BoneOffset + 4)[0]
+        newLocx = TRX / 79
+        newLocz = -25.5
+        newLocz += TRZ / 79
+        newLocy = TRY / 79
+
+        bpy.context.scene.tool_settings.use_keyframe_insert_auto = True
+
+        for i in range(BoneCount):
+            bIndx = ((BoneCount-1) - i) # Had to reverse here, cuz didn't find a way to rotate bones on LOCAL space, start rotating from last to first bone on hierarchy GLOBAL.
+            RX = unpack_from(">h", segment[AniSeg], rot_offset)[0]
+            rot_offset -= 2
+            RY = unpack_from(">h", segment[AniSeg], rot_offset + 4)[0]
+            rot_offset -= 2
+            RZ = unpack_from(">h", segment[AniSeg], rot_offset + 8)[0]
+            rot_offset -= 2
+
+            RX /= (182.04444444444444444444)
+            RY /= (182.04444444444444444444)
+            RZ /= (182.04444444444444444444)
+
+            RXX = (RX)
+            RYY = (-RZ)
+            RZZ = (RY)
+
+            log.trace('limb: %d RX %d RZ %d RY %d anim: %d frame: %d', bIndx, int(RXX), int(RZZ), int(RYY), currentanim+1, frameCurrent+1)
+            if (i > -1):
+                bone = self.armatures[hierarchy].bones["limb_%02i" % (bIndx)]
+                bone.select = True
+                bpy.ops.transform.rotate(value = radians(RXX), axis=(0, 0, 0), constraint_axis=(True, False, False))
+                bpy.ops.transform.rotate(value = radians(RZZ), axis=(0, 0, 0), constraint_axis=(False, False, True))
+                bpy.ops.transform.rotate(value = radians(RYY), axis=(0, 0, 0), constraint_axis=(False, True, False))
+                bpy.ops.pose.select_all(action="DESELECT")
+
+        self.armatures[hierarchy].bones["limb_00"].select = True ## Translations
+        bpy.ops.transform.translate(value =(newLocx, 0, 0), constraint_axis=(True, False, False))
+        bpy.ops.transform.translate(value = (0, 0, newLocz), constraint_axis=(False, False, True))
+        bpy.ops.transform.translate(value = (0, newLocy, 0), constraint_axis=(False, True, False))
+        bpy.ops.pose.select_all(action="DESELECT")
+
+        if (frameCurrent < (frameTotal - 1)):## Next Frame ### Could have done some math here but... just reverse previus frame, so it just repose.
+            bpy.context.scene.tool_settings.use_keyframe_insert_auto = False
+
+            self.armatures[hierarchy].bones["limb_00"].select = True ## Translations
+            bpy.ops.transform.translate(value = (-newLocx, 0, 0), constraint_axis=(True, False, False))
+            bpy.ops.transform.translate(value = (0, 0, -newLocz), constraint_axis=(False, False, True))
+            bpy.ops.transform.translate(value = (0, -newLocy, 0), constraint_axis=(False, True, False))
+            bpy.ops.pose.select_all(action="DESELECT")
+
+            rot_offset = AnimationOffset
+            rot_offset += (frameCurrent * (BoneCount * 6 + 8))
+            rot_offset += 6
+            for i in range(BoneCount):
+                RX = unpack_from(">h", segment[AniSeg], rot_offset)[0]
+                rot_offset += 2
+                RY = unpack_from(">h", segment[AniSeg], rot_offset)[0]
+                rot_offset += 2
+                RZ = unpack_from(">h", segment[AniSeg], rot_offset)[0]
+                rot_offset += 2
+
+                RX /= (182.04444444444444444444)
+                RY /= (182.04444444444444444444)
+                RZ /= (182.04444444444444444444)
+
+                RXX = (-RX)
+                RYY = (RZ)
+                RZZ = (-RY)
+
+                log.trace("limb: %d RX %d RZ %d RY %d anim: %d frame: %d", i, int(RXX), int(RZZ), int(RYY), currentanim+1, frameCurrent+1)
+                if (i > -1):
+                    bone = self.armatures[hierarchy].bones["limb_%02i" % (i)]
+                    bone.select = True
+                    bpy.ops.transform.rotate(value = radians(RYY), axis=(0, 0, 0), constraint_axis=(False, True, False))
+                    bpy.ops.transform.rotate(value = radians(RZZ), axis=(0, 0, 0), constraint_axis=(False, False, True))
+                    bpy.ops.transform.rotate(value = radians(RXX), axis=(0, 0, 0), constraint_axis=(True, False, False))
+                    bpy.ops.pose.select_all(action="DESELECT")
+
+            bpy.context.scene.frame_end += 1
+            bpy.context.scene.frame_current += 1
+            frameCurrent += 1
+            self.buildLinkAnimations(hierarchy, frameCurrent)
+        else:
+            bpy.context.scene.tool_settings.use_keyframe_insert_auto = False
+            bpy.context.scene.frame_current = 1
+
+    def buildAllAnimations(self):
+        global AnimtoPlay
+        log = getLogger('SceneBuilder.buildAllAnimations')
+        f3dzex = self.f3dzex
+        armature = self.armatures[f3dzex.hierarchy[0]]
+        bpy.context.scene.objects.active = armature
+        armature.select = True
+        bpy.ops.object.mode_set(mode='POSE', toggle=False)
+        if not core.loadAnimations:
+            log.info("    Load anims OFF.")
+            return
+        if len(f3dzex.animations) > 0:
+            # use the hierarchy with most bones
+            # this works for building any animation regardless of its target skeleton (bone positions) because all limbs are named limb_XX, so the hierarchy with most bones has bones with same names as every other armature
+            # and the rotation and root location animated values don't rely on the actual armature used
+            # and in blender each action can be used for any armature, vertex groups/bone names just have to match
+            # this is useful for iron knuckles and anything with several hierarchies, although an unedited iron kunckles zobj won't work
+            hierarchy = max(f3dzex.hierarchy, key=lambda h:h.limbCount)
+            for armature in self.armatures.values():
+                self.indexAnimations(armature, hierarchy)
+            if not bakeAnimations:
+                log.info('Listed %d animations on the armatures, build them from the Zelda64 Animations panel', len(f3dzex.animations))
+                return
+            bpy.context.scene.frame_end = 1
+            for armature in self.armatures.values():
+                if armature.animation_data is None:
+                    armature.animation_data_create()
+            log.info('Building animations using the bones of %s', hierarchy.name)
+            for i, animation in enumerate(f3dzex.animations):
+                AnimtoPlay = i + 1
+                log.info("   Building animation %d/%d 0x%08X", AnimtoPlay, len(f3dzex.animations), animation.offset)
+                action = bpy.data.actions.new(self.prefix + ('anim%d_%d' % (AnimtoPlay, animation.duration)))
+                # not sure what users an action is supposed to have, or what it should be linked to
+                action.use_fake_user = True
+                buildAnimation(animation, action, hierarchy.boneNames, core.scaleFactor)
+                for armature in self.armatures.values():
+                    armature.z64Animations[i].action = action
+            for armature in self.armatures.values():
+                armature.animation_data.action = action
+            bpy.context.scene.frame_end = max(animation.duration for animation in f3dzex.animations)
+        elif f3dzex.useLinkAnimations:
+            self.buildLinkAnimations(f3dzex.hierarchy[0], 0)
+
+    def indexAnimations(self, armature, hierarchy):
+        """
+        List the animations on armature (see Z64Animation), for building them when needed with the bones of hierarchy
+        """
+        armature.z64Animations.clear()
+        armature.z64AnimationLimbCount = hierarchy.limbCount
+        armature.z64AnimationScale = core.scaleFactor
+        for i, animation in enumerate(self.f3dzex.animations):
+            entry = armature.z64Animations.add()
+            entry.name = self.prefix + ('anim%d_%d' % (i + 1, animation.duration))
+            entry.offset = animation.offset
+            entry.frameCount = animation.duration
+            entry.path = self.f3dzex.segmentPaths.get(splitOffset(animation.offset)[0], '')
+
+global Animscount
+Animscount = 1
+
+class ImportZ64(bpy.types.Operator, ImportHelper):
+    """Load a Zelda64 File"""
+    bl_idname    = "file.zobj2020"
+    bl_label     = "Import Zelda64"
+    bl_options   = {'PRESET', 'UNDO'}
+    filename_ext = ".zobj"
+    filter_glob  = StringProperty(default="*.zobj;*.zroom;*.zmap", options={'HIDDEN'})
+
+    files = CollectionProperty(
+        name="Files",
+        type=bpy.types.OperatorFileListElement,)
+    directory = StringProperty(subtype='DIR_PATH')
+
+    loadOtherSegments = BoolProperty(name="Load Data From Other Segments",
+                                    description="Load data from other segments",
+                                    default=True,)
+    importType = EnumProperty(
+        name='Import type',
+        items=(('AUTO', 'Auto', 'Assume Room File if .zroom or .zmap, otherwise assume Object File'),
+               ('OBJECT', 'Object File', 'Assume the file being imported is an object file'),
+               ('ROOM', 'Room File', 'Assume the file being imported is a room file'),),
+        description='What to assume the file being imported is',
+        default='AUTO',)
+    importStrategy = EnumProperty(name='Detect DLists',
+                                 items=(('NO_DETECTION', 'Minimum', 'Maps: only use headers\nObjects: only use hierarchies\nOnly this option will not create unexpected geometry'),
+                                        ('BRUTEFORCE', 'Bruteforce', 'Try to import everything that looks like a display list\n(ignores header for maps)'),
+                                        ('SMART', 'Smart-ish', 'Minimum + Bruteforce but avoids reading the same display lists several times'),
+                                        ('TRY_EVERYTHING', 'Try everything', 'Minimum + Bruteforce'),),
+                                 description='How to find display lists to import (try this if there is missing geometry)',
+                                 default='NO_DETECTION',)
+    vertexMode = EnumProperty(name="Vtx Mode",
+                             items=(('COLORS', "COLORS", "Use vertex colors"),
+                                    ('NORMALS', "NORMALS", "Use vertex normals as shading"),
+                                    ('NONE', "NONE", "Don't use vertex colors or normals"),
+                                    ('AUTO', "AUTO", "Switch between normals and vertex colors automatically according to 0xD9 G_GEOMETRYMODE flags"),),
+                             description="Legacy option, shouldn't be useful",
+                             default='AUTO',)
+    useVertexAlpha = BoolProperty(name="Use vertex alpha",
+                                 description="Only enable if your version of blender has native support",
+                                 default=(bpy.app.version == (2,79,7) and bpy.app.build_hash in {b'10f724cec5e3', b'e045fe53f1b0'}),)
+    enableMatrices = BoolProperty(name="Matrices",
+                                 description="Use 0xDA G_MTX and 0xD8 G_POPMTX commands",
+                                 default=True,)
+    displayListMaxDepth = IntProperty(name="Max DList Depth",
+                             description="How deep display lists calling other display lists (0xDE G_DL) may be nested, deeper calls are skipped",
+                             default=32, min=1, soft_max=256)
+    displayListMaxCommands = IntProperty(name="Max DList Commands",
+                             description="How many commands may be read from a display list and the ones it calls before giving up on it (0 for no limit)",
+                             default=1000000, min=0)
+    detectedDisplayLists_use_transparency = BoolProperty(name="Default to transparency",
+                                                         description='Set material to use transparency or not for display lists that were detected',
+                                                         default=False,)
+    detectedDisplayLists_consider_unimplemented_invalid = BoolProperty(
+                                    name='Unimplemented => Invalid',
+                                    description='Consider that unimplemented opcodes are invalid when detecting display lists.\n'
+                                                'The reasoning is that unimplemented opcodes are very rare or never actually used.',
+                                    default=True,)
+    enablePrimColor = BoolProperty(name="Prim Color",
+                                  description="Enable blending with primitive color",
+                                  default=False,) # this may be nice for strictly importing but exporting again will then not be exact
+    enableEnvColor = BoolProperty(name="Env Color",
+                                 description="Enable blending with environment color",
+                                 default=False,) # same as primColor above
+    invertEnvColor = BoolProperty(name="Invert Env Color",
+                                 description="Invert environment color (temporary fix)",
+                                 default=False,) # todo what is this?
+    exportTextures = BoolProperty(name="Export Textures",
+                                 description="Export textures for the model",
+                                 default=True,)
+    createImagesInMemory = BoolProperty(name="In-memory Images",
+                                 description="Create images directly from the decoded textures instead of loading them back from the texture files.\n"
+                                             "Texture files are then written all at once at the end of the import, if exporting textures",
+                                 default=False,)
+    textureDecodeProcesses = IntProperty(name="Texture Processes",
+                             description="How many processes decode textures at the end of the import (0 for one per CPU core, 1 to decode in Blender's process).\n"
+                                         "Not supported on Windows",
+                             default=1, min=0, soft_max=64)
+    textureCacheSize = IntProperty(name="Texture Cache (MB)",
+                             description="Size of the texture cache shared across imports, textures found in the cache are not decoded again (0 disables the cache)",
+                             default=64, min=0, soft_max=1024)
+    importTextures = BoolProperty(name="Import Textures",
+                                 description="Import textures for the model",
+                                 default=True,)
+    enableTexClampBlender = BoolProperty(name="Texture Clamp",
+                                 description="Enable texture clamping in Blender, used by Blender in the 3d viewport and by zzconvert",
+                                 default=False,)
+    replicateTexMirrorBlender = BoolProperty(name="Texture Mirror",
+                                  description="Replicate texture mirroring by writing the textures with the mirrored parts (with double width/height) instead of the initial texture",
+                                  default=False,)
+    enableTexClampSharpOcarinaTags = BoolProperty(name="Texture Clamp SO Tags",
+                                 description="Add #ClampX and #ClampY tags where necessary in the texture filename, used by SharpOcarina",
+                                 default=False,)
+    enableTexMirrorSharpOcarinaTags = BoolProperty(name="Texture Mirror SO Tags",
+                                  description="Add #MirrorX and #MirrorY tags where necessary in the texture filename, used by SharpOcarina",
+                                  default=False,)
+    enableShadelessMaterials = BoolProperty(name="Shadeless Materials",
+                                  description="Set materials to be shadeless, prevents using environment colors in-game",
+                                  default=False,)
+    enableToon = BoolProperty(name="Toony UVs",
+                             description="Obtain a toony effect by not scaling down the uv coords",
+                             default=False,)
+    originalObjectScale = IntProperty(name="File Scale",
+                             description="Scale of imported object, blender model will be scaled 1/(file scale) (use 1 for maps, actors are usually 100, 10 or 1) (0 defaults to 1 for maps and 100 for actors)",
+                             default=0, min=0, soft_max=1000)
+    loadAnimations = BoolProperty(name="Load animations",
+                             description="For animated actors, load all animations or none",
+                             default=True,)
+    bakeAnimations = BoolProperty(name="Build all animations",
+                             description="Build an action for every animation when importing, instead of only listing them on the armature to build when selected in the Zelda64 Animations panel",
+                             default=False,)
+    MajorasAnims = BoolProperty(name="MajorasAnims",
+                             description="Majora's Mask Link's Anims.",
+                             default=False,)
+    ExternalAnimes = BoolProperty(name="ExternalAnimes",
+                             description="Load External Animes.",
+                             default=False,)
+    prefixMultiImport = BoolProperty(name='Prefix multi-import',
+                             description='Add a prefix to imported data (objects, materials, images...) when importing several files at once',
+                             default=True,)
+    setView3dParameters = BoolProperty(name="Set 3D View parameters",
+                             description="For maps, use a more appropriate grid size and clip distance",
+                             default=True,)
+    logging_level = IntProperty(name="Log level",
+                             description="(logs in the system console) The lower, the more logs. trace=%d debug=%d info=%d" % (logging_trace_level,logging.DEBUG,logging.INFO),
+                             default=logging.INFO, min=1, max=51)
+    report_logging_level = IntProperty(name='Report level',
+                             description='What logs to report to Blender. When the import is done, warnings and errors are shown, if any. trace=%d debug=%d info=%d' % (logging_trace_level,logging.DEBUG,logging.INFO),
+                             default=logging.INFO, min=1, max=51)
+    logging_logfile_enable = BoolProperty(name='Log to file',
+                             description='Log everything (all levels) to a file',
+                             default=False,)
+    logging_logfile_path = StringProperty(name='Log file path',
+                             #subtype='FILE_PATH', # cannot use two FILE_PATH at the same time
+                             description='File to write logs to\nPath can be relative (to imported file) or absolute',
+                             default='log_io_import_z64.txt',)
+
+    def execute(self, context):
+        global exportTextures, enableTexClampBlender
+        global AnimtoPlay
+        exportTextures = self.exportTextures
+        enableTexClampBlender = self.enableTexClampBlender
+        AnimtoPlay = 1 if self.loadAnimations else 0
+        global bakeAnimations
+        bakeAnimations = self.bakeAnimations
+        global enableShadelessMaterials
+        enableShadelessMaterials = self.enableShadelessMaterials
+        global textureCache
+        textureCache = None
+        global createImagesInMemory, textureDecodeQueue
+        createImagesInMemory = self.createImagesInMemory
+        textureDecodeQueue = TextureDecodeQueue(self.textureDecodeProcesses)
+
+        setLoggingLevel(self.logging_level)
+        log = getLogger('ImportZ64.execute')
+        if self.logging_logfile_enable:
+            logfile_path = self.logging_logfile_path
+            if not os.path.isabs(logfile_path):
+                logfile_path = os.path.join(self.directory, logfile_path)
+            log.info('Writing logs to %s' % logfile_path)
+            setLogFile(logfile_path)
+        setLogOperator(self, self.report_logging_level)
+
+        if self.textureCacheSize > 0:
+            textureCachePath = bpy.utils.user_resource('DATAFILES', 'z64import_texture_cache', create=True)
+            if textureCachePath:
+                textureCache = TextureCache(textureCachePath, self.textureCacheSize * 1024 * 1024)
+            else:
+                log.warning('Could not locate a directory for the texture cache, not using it')
+
+        try:
+            for file in self.files:
+                filepath = os.path.join(self.directory, file.name)
+                if len(self.files) == 1 or not self.prefixMultiImport:
+                    prefix = ""
+                else:
+                    prefix = file.name + "_"
+                self.executeSingle(filepath, prefix=prefix)
+            textureDecodeQueue.run()
+            bpy.context.scene.update()
+        finally:
+            if textureCache:
+                textureCache.save()
+                textureCache = None
+            setLogFile(None)
+            setLogOperator(None)
+        return {'FINISHED'}
+
+    def executeSingle(self, filepath, prefix=""):
+        fpath, fext = os.path.splitext(filepath)
+        fpath, fname = os.path.split(fpath)
+
+        if self.importType == "AUTO":
+            if fext.lower() in {'.zmap', '.zroom'}:
+                importType = "ROOM"
+            else:
+                importType = "OBJECT"
+        else:
+            importType = self.importType
+
+        log = getLogger('ImportZ64.executeSingle')
+
+        log.info("Importing '%s'..." % fname)
+        time_start = time.time()
+        self.run_import(filepath, importType, prefix=prefix)
+        log.info("SUCCESS:  Elapsed time %.4f sec" % (time.time() - time_start))
+
+    def run_import(self, filepath, importType, prefix=""):
+        log = getLogger('ImportZ64.run_import')
+        f3dzex = core.parseFile(
+            filepath, importType,
+            {name: getattr(self, name) for name in core.optionDefaults},
+            prefix=prefix
+        )
+        log.debug('Creating Blender data')
+        SceneBuilder(f3dzex).build()
+
+        if self.setView3dParameters:
+            for screen in bpy.data.screens:
+                for area in screen.areas:
+                    if area.type == 'VIEW_3D':
+                        if importType == "ROOM":
+                            area.spaces.active.grid_lines = 500
+                            area.spaces.active.grid_scale = 10
+                            area.spaces.active.grid_subdivisions = 10
+                            area.spaces.active.clip_end = 900000
+                        area.spaces.active.viewport_shade = "TEXTURED"
+
+    def draw(self, context):
+        l = self.layout
+        l.prop(self, 'importType', text='Type')
+        l.prop(self, 'importStrategy', text='Strategy')
+        if self.importStrategy != 'NO_DETECTION':
+            l.prop(self, 'detectedDisplayLists_use_transparency')
+            l.prop(self, 'detectedDisplayLists_consider_unimplemented_invalid')
+        l.prop(self, "vertexMode")
+        l.prop(self, 'useVertexAlpha')
+        l.prop(self, "loadOtherSegments")
+        l.prop(self, "originalObjectScale")
+        box = l.box()
+        box.prop(self, "enableTexClampBlender")
+        box.prop(self, "replicateTexMirrorBlender")
+        if self.replicateTexMirrorBlender:
+            wBox = box.box()
+            wBox.label(text='Enabling texture mirroring', icon='ERROR')
+            wBox.label(text='will break exporting with', icon='ERROR')
+            wBox.label(text='SharpOcarina, and may break', icon='ERROR')
+            wBox.label(text='exporting in general with', icon='ERROR')
+            wBox.label(text='other tools.', icon='ERROR')
+        box.prop(self, "enableTexClampSharpOcarinaTags")
+        box.prop(self, "enableTexMirrorSharpOcarinaTags")
+        l.prop(self, "enableMatrices")
+        l.prop(self, "displayListMaxDepth")
+        l.prop(self, "displayListMaxCommands")
+        l.prop(self, "enablePrimColor")
+        l.prop(self, "enableEnvColor")
+        l.prop(self, "invertEnvColor")
+        l.prop(self, "exportTextures")
+        l.prop(self, "createImagesInMemory")
+        l.prop(self, "textureDecodeProcesses")
+        l.prop(self, "textureCacheSize")
+        l.prop(self, "importTextures")
+        l.prop(self, "enableShadelessMaterials")
+        l.prop(self, "enableToon")
+        l.separator()
+        l.prop(self, "loadAnimations")
+        if self.loadAnimations:
+            l.prop(self, "bakeAnimations")
+        l.prop(self, "MajorasAnims")
+        l.prop(self, "ExternalAnimes")
+        l.prop(self, "prefixMultiImport")
+        l.prop(self, "setView3dParameters")
+        l.separator()
+        l.prop(self, "logging_level")
+        l.prop(self, 'logging_logfile_enable')
+        if self.logging_logfile_enable:
+            l.prop(self, 'logging_logfile_path')
+
+class Z64Animation(bpy.types.PropertyGroup):
+    """
+    Animation found when importing, listed on the armature (Object.z64Animations) and built into an action when needed
+    name is the name of the action
+    """
+    offset = IntProperty(name='Offset',
+                             description='Segmented offset of the animation header')
+    frameCount = IntProperty(name='Frames',
+                             description='Frame count of the animation')
+    path = StringProperty(name='Source',
+                             description='File holding the data of the animation segment',
+                             subtype='FILE_PATH')
+    action = PointerProperty(name='Action',
+                             description='Action built from the animation, if any',
+                             type=bpy.types.Action)
+
+def buildIndexedAnimation(armature, index):
+    """
+    Action of the animation armature.z64Animations[index], built from its source file if it was not yet,
+    or None if the animation could not be read
+    """
+    entry = armature.z64Animations[index]
+    if entry.action is not None:
+        return entry.action
+    log = getLogger('buildIndexedAnimation')
+    log.info('Building animation %s 0x%08X from %s', entry.name, entry.offset, entry.path)
+    limbCount = armature.z64AnimationLimbCount
+    animation = core.readAnimation(bpy.path.abspath(entry.path), entry.offset, entry.frameCount, limbCount)
+    if animation is None:
+        log.error('Could not read animation %s 0x%08X from %s', entry.name, entry.offset, entry.path)
+        return None
+    action = bpy.data.actions.new(entry.name)
+    action.use_fake_user = True
+    buildAnimation(animation, action, ["limb_%02i" % i for i in range(limbCount)], armature.z64AnimationScale)
+    # armatures imported from the same file list the same animations
+    for ob in bpy.data.objects:
+        for other in ob.z64Animations:
+            if other.action is None and other.offset == entry.offset and other.path == entry.path:
+                other.action = action
+    return action
+
+def playIndexedAnimation(armature, index, scene):
+    """
+    Assign the animation armature.z64Animations[index] to armature, building it if needed
+    Returns the action, or None (and assigns nothing) if the animation could not be read
+    """
+    action = buildIndexedAnimation(armature, index)
+    if action is None:
+        return None
+    if armature.animation_data is None:
+        armature.animation_data_create()
+    armature.animation_data.action = action
+    scene.frame_start = 1
+    scene.frame_end = max(1, armature.z64Animations[index].frameCount)
+    return action
+
+def updateAnimationIndex(self, context):
+    if 0 <= self.z64AnimationIndex < len(self.z64Animations):
+        try:
+            playIndexedAnimation(self, self.z64AnimationIndex, context.scene)
+        except OSError as e:
+            getLogger('updateAnimationIndex').error('Could not read animation %s: %s', self.z64Animations[self.z64AnimationIndex].name, e)
+
+class Z64BuildAnimation(bpy.types.Operator):
+    """Build a Zelda64 animation of the armature if needed and assign it"""
+    bl_idname = "object.z64_build_animation"
+    bl_label = "Build Animation"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index = IntProperty(name='Index',
+                             description='Animation to build in the armature animation list, -1 for the selected one',
+                             default=-1, min=-1)
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.object.z64Animations) > 0
+
+    def execute(self, context):
+        armature = context.object
+        index = armature.z64AnimationIndex if self.index < 0 else self.index
+        if not 0 <= index < len(armature.z64Animations):
+            self.report({'ERROR'}, 'No animation %d on %s' % (index, armature.name))
+            return {'CANCELLED'}
+        try:
+            action = playIndexedAnimation(armature, index, context.scene)
+        except OSError as e:
+            self.report({'ERROR'}, 'Could not read animation %s: %s' % (armature.z64Animations[index].name, e))
+            return {'CANCELLED'}
+        if action is None:
+            self.report({'ERROR'}, 'Animation %s is invalid, no action was built' % armature.z64Animations[index].name)
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class Z64BuildAllAnimations(bpy.types.Operator):
+    """Build every Zelda64 animation of the armature not built yet, one at a time in the background when run from the interface"""
+    bl_idname = "object.z64_build_all_animations"
+    bl_label = "Build All Animations"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.object.z64Animations) > 0
+
+    def execute(self, context):
+        armature = context.object
+        self.skipped = []
+        try:
+            for index in range(len(armature.z64Animations)):
+                if buildIndexedAnimation(armature, index) is None:
+                    self.skipped.append(armature.z64Animations[index].name)
+        except OSError as e:
+            self.report({'ERROR'}, 'Could not read animations: %s' % e)
+            return {'CANCELLED'}
+        self.reportSkipped()
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        armature = context.object
+        self.armatureName = armature.name
+        self.pending = [index for index, entry in enumerate(armature.z64Animations) if entry.action is None]
+        if not self.pending:
+            return {'FINISHED'}
+        self.total = len(self.pending)
+        self.skipped = []
+        wm = context.window_manager
+        wm.progress_begin(0, self.total)
+        self.timer = wm.event_timer_add(0.01, context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.finish(context)
+            self.report({'INFO'}, 'Built %d/%d animations' % (self.total - len(self.pending), self.total))
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        armature = bpy.data.objects.get(self.armatureName)
+        if armature is None or self.pending[0] >= len(armature.z64Animations):
+            self.finish(context)
+            return {'CANCELLED'}
+        index = self.pending.pop(0)
+        try:
+            if buildIndexedAnimation(armature, index) is None:
+                self.skipped.append(armature.z64Animations[index].name)
+        except OSError as e:
+            self.finish(context)
+            self.report({'ERROR'}, 'Could not read animations: %s' % e)
+            return {'CANCELLED'}
+        context.window_manager.progress_update(self.total - len(self.pending))
+        if not self.pending:
+            self.finish(context)
+            return {'FINISHED'}
+        return {'PASS_THROUGH'}
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        self.reportSkipped()
+
+    def reportSkipped(self):
+        if self.skipped:
+            self.report({'WARNING'}, 'Skipped %d invalid animations: %s' % (len(self.skipped), ', '.join(self.skipped)))
+
+class Z64AnimationList(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.label(text=item.name, icon='ACTION' if item.action else 'BLANK1')
+        layout.label(text='0x%08X' % item.offset)
+
+class Z64AnimationsPanel(bpy.types.Panel):
+    """Animations listed on an armature imported from a Zelda64 file"""
+    bl_label = "Zelda64 Animations"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = 'object'
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.object.z64Animations) > 0
+
+    def draw(self, context):
+        armature = context.object
+        l = self.layout
+        l.template_list('Z64AnimationList', '', armature, 'z64Animations', armature, 'z64AnimationIndex')
+        row = l.row()
+        row.operator(Z64BuildAnimation.bl_idname)
+        row.operator(Z64BuildAllAnimations.bl_idname)
+
+def menu_func_import(self, context):
+    self.layout.operator(ImportZ64.bl_idname, text="Zelda64 (.zobj;.zroom;.zmap)")
+
+
+def register():
+    registerLogging()
+    bpy.utils.register_module(__name__)
+    bpy.types.Object.z64Animations = CollectionProperty(type=Z64Animation)
+    bpy.types.Object.z64AnimationIndex = IntProperty(name='Animation',
+                             description='Selected animation, selecting one builds it if needed and assigns it',
+                             default=-1, update=updateAnimationIndex)
+    bpy.types.Object.z64AnimationLimbCount = IntProperty(name='Animated limbs',
+                             description='How many limbs to read from the animations',
+                             default=0, min=0)
+    bpy.types.Object.z64AnimationScale = FloatProperty(name='Animation scale',
+                             description='Scale of the root limb locations',
+                             default=1 / 100)
+    bpy.types.INFO_MT_file_import.append(menu_func_import)
+
+def unregister():
+    del bpy.types.Object.z64Animations
+    del bpy.types.Object.z64AnimationIndex
+    del bpy.types.Object.z64AnimationLimbCount
+    del bpy.types.Object.z64AnimationScale
+    bpy.utils.unregister_module(__name__)
+    bpy.types.INFO_MT_file_import.remove(menu_func_import)
+    unregisterLogging()
+
+
+if __name__ == "__main__":
+    register()
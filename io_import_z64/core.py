@@ -0,0 +1,2291 @@
+# zelda64-import-blender
+# Import models from Zelda64 files into Blender
+# Copyright (C) 2013 SoulofDeity
+# Copyright (C) 2020 Dragorn421
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>
+
+"""
+Parsing of Zelda64 files into an intermediate representation, independent of Blender:
+meshes as arrays, materials as descriptors, skeletons, and animations as frames x limbs arrays
+See parse_object and parse_room, the addon (__init__.py) creates Blender data from the result
+"""
+
+import bisect, functools, hashlib, io, json, os, re, struct
+import numpy
+
+from array import array
+from collections import OrderedDict
+from struct import pack, unpack_from
+
+# logging stuff, code mostly uses getLogger()
+import logging
+
+# https://stackoverflow.com/questions/2183233/how-to-add-a-custom-loglevel-to-pythons-logging-facility
+logging_trace_level = 5
+logging.addLevelName(logging_trace_level, 'TRACE')
+
+# handlers are only added by registerLogging(), the core can also be used without them
+root_logger = logging.getLogger('z64import')
+
+def getLogger(name):
+    global root_logger
+    log = root_logger.getChild(name)
+    def trace(message, *args, **kws):
+        if log.isEnabledFor(logging_trace_level):
+            log._log(logging_trace_level, message, args, **kws)
+    log.trace = trace
+    return log
+
+def registerLogging(level=logging.INFO):
+    global root_logger, root_logger_formatter, root_logger_stream_handler, root_logger_file_handler, root_logger_operator_report_handler
+    root_logger = logging.getLogger('z64import')
+    root_logger_stream_handler = logging.StreamHandler()
+    root_logger_file_handler = None
+    root_logger_operator_report_handler = None
+    root_logger_formatter = logging.Formatter('%(levelname)s:%(name)s: %(message)s')
+    root_logger_stream_handler.setFormatter(root_logger_formatter)
+    root_logger.addHandler(root_logger_stream_handler)
+    root_logger.setLevel(1) # actual level filtering is left to handlers
+    root_logger_stream_handler.setLevel(level)
+    getLogger('setupLogging').debug('Logging OK')
+
+def setLoggingLevel(level):
+    global root_logger_stream_handler
+    root_logger_stream_handler.setLevel(level)
+
+def setLogFile(path):
+    global root_logger, root_logger_formatter, root_logger_file_handler
+    if root_logger_file_handler:
+        root_logger.removeHandler(root_logger_file_handler)
+        root_logger_file_handler = None
+    if path:
+        root_logger_file_handler = logging.FileHandler(path, mode='w')
+        root_logger_file_handler.setFormatter(root_logger_formatter)
+        root_logger.addHandler(root_logger_file_handler)
+        root_logger_file_handler.setLevel(1)
+
+class OperatorReportLogHandler(logging.Handler):
+    def __init__(self, operator):
+        super().__init__()
+        self.operator = operator
+
+    def flush(self):
+        pass
+
+    def emit(self, record):
+        try:
+            type = 'DEBUG'
+            for levelType,  minLevel in (
+                ('ERROR',   logging.WARNING), # comment to allow calling bpy.ops.file.zobj2020 without RuntimeError (makes WARNING the highest report level instead of ERROR)
+                ('WARNING', logging.INFO),
+                ('INFO',    logging.DEBUG)
+            ):
+                if record.levelno > minLevel:
+                    type = levelType
+                    break
+            msg = self.format(record)
+            self.operator.report({type}, msg)
+        except Exception:
+            self.handleError(record)
+
+def setLogOperator(operator, level=logging.INFO):
+    global root_logger, root_logger_formatter, root_logger_operator_report_handler
+    if root_logger_operator_report_handler:
+        root_logger.removeHandler(root_logger_operator_report_handler)
+        root_logger_operator_report_handler = None
+    if operator:
+        root_logger_operator_report_handler = OperatorReportLogHandler(operator)
+        root_logger_operator_report_handler.setFormatter(root_logger_formatter)
+        root_logger_operator_report_handler.setLevel(level)
+        root_logger.addHandler(root_logger_operator_report_handler)
+
+def unregisterLogging():
+    global root_logger, root_logger_stream_handler
+    setLogFile(None)
+    setLogOperator(None)
+    root_logger.removeHandler(root_logger_stream_handler)
+#
+
+# import options, see setOptions
+optionDefaults = {
+    'importStrategy': 'NO_DETECTION',
+    'vertexMode': 'AUTO',
+    'useVertexAlpha': False,
+    'enableMatrices': True,
+    'displayListMaxDepth': 32,
+    'displayListMaxCommands': 1000000,
+    'detectedDisplayLists_use_transparency': False,
+    'detectedDisplayLists_consider_unimplemented_invalid': True,
+    'enablePrimColor': False,
+    'enableEnvColor': False,
+    'invertEnvColor': False,
+    'importTextures': True,
+    'replicateTexMirrorBlender': False,
+    'enableTexClampSharpOcarinaTags': False,
+    'enableTexMirrorSharpOcarinaTags': False,
+    'enableToon': False,
+    'originalObjectScale': 0,
+    'loadOtherSegments': True,
+    'loadAnimations': True,
+    'MajorasAnims': False,
+    'ExternalAnimes': False,
+}
+
+def setOptions(options=None):
+    """
+    Set the import options (module globals) from a dict of option name -> value,
+    options not in the dict are set to their default value from optionDefaults
+    """
+    options = options or {}
+    unknown = set(options) - set(optionDefaults)
+    if unknown:
+        raise ValueError('Unknown options %s' % ', '.join(sorted(unknown)))
+    for name, default in optionDefaults.items():
+        globals()[name] = options.get(name, default)
+
+setOptions()
+
+# directory of the file being imported and scale of the imported data, see parseFile
+fpath = '.'
+scaleFactor = 1 / 100
+
+def splitOffset(offset):
+    return offset >> 24, offset & 0x00FFFFFF
+
+def validOffset(segment, offset):
+    seg, offset = splitOffset(offset)
+    if seg > 15:
+        return False
+    if offset >= len(segment[seg]):
+        return False
+    return True
+
+def pow2(val):
+    i = 1
+    while i < val:
+        i <<= 1
+    return int(i)
+
+def powof(val):
+    num, i = 1, 0
+    while num < val:
+        num <<= 1
+        i += 1
+    return int(i)
+
+def checkUseVertexAlpha():
+    global useVertexAlpha
+    return useVertexAlpha
+
+class TextureCache:
+    """
+    Persistent cache of texture files shared across imports, keyed by a hash of everything the texture file depends on
+    Entries are stored as individual files in the cache directory, least recently used entries are evicted first
+    """
+    def __init__(self, path, maxSize):
+        self.path = path
+        self.maxSize = maxSize
+        self.indexPath = os.path.join(path, 'index.json')
+        # key -> size in bytes, least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        self.dirty = False
+        log = getLogger('TextureCache')
+        try:
+            os.makedirs(path, exist_ok=True)
+        except:
+            log.exception('Could not create texture cache directory %s', path)
+        if os.path.isfile(self.indexPath):
+            try:
+                with open(self.indexPath) as f:
+                    for key, size in json.load(f):
+                        if os.path.isfile(self.getEntryPath(key)):
+                            self.entries[key] = size
+                            self.size += size
+            except:
+                log.exception('Could not read texture cache index %s, starting with an empty cache', self.indexPath)
+                self.entries.clear()
+                self.size = 0
+        log.debug('Texture cache %s has %d entries (%d bytes)', path, len(self.entries), self.size)
+
+    def getEntryPath(self, key):
+        return os.path.join(self.path, '%s.tga' % key)
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        try:
+            with open(self.getEntryPath(key), 'rb') as f:
+                data = f.read()
+        except:
+            getLogger('TextureCache.get').exception('Could not read texture cache entry %s, removing it', key)
+            self.size -= self.entries.pop(key)
+            self.dirty = True
+            return None
+        self.entries.move_to_end(key)
+        self.dirty = True
+        return data
+
+    def put(self, key, data):
+        log = getLogger('TextureCache.put')
+        if len(data) > self.maxSize:
+            return
+        try:
+            with open(self.getEntryPath(key), 'wb') as f:
+                f.write(data)
+        except:
+            log.exception('Could not write texture cache entry %s', key)
+            return
+        if key in self.entries:
+            self.size -= self.entries.pop(key)
+        self.entries[key] = len(data)
+        self.size += len(data)
+        self.dirty = True
+        while self.size > self.maxSize:
+            evictedKey, evictedSize = self.entries.popitem(last=False)
+            self.size -= evictedSize
+            log.trace('Evicting texture cache entry %s', evictedKey)
+            try:
+                os.remove(self.getEntryPath(evictedKey))
+            except OSError:
+                pass
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            with open(self.indexPath, 'w') as f:
+                json.dump(list(self.entries.items()), f)
+            self.dirty = False
+        except:
+            getLogger('TextureCache.save').exception('Could not write texture cache index %s', self.indexPath)
+
+# see getTexelTables
+texelTables = None
+
+def getTexelTables():
+    """
+    Lookup tables from texel values to BGRA bytes, by (texFmt, texSiz)
+    The RGBA16 table is also used for palettes (CI textures)
+    Tables are built on first use and kept for the rest of the Blender session
+    """
+    global texelTables
+    if texelTables is None:
+        def bgra(r, g, b, a):
+            return numpy.stack((b, g, r, a), axis=-1).astype(numpy.uint8)
+        v16 = numpy.arange(0x10000, dtype=numpy.uint32)
+        v8 = v16[:0x100]
+        v4 = v16[:0x10]
+        ia4 = (v4 >> 1) * 255 // 7
+        ia8 = (v8 >> 4) * 255 // 15
+        i4 = v4 * 255 // 15
+        texelTables = {
+            (0,2): bgra( # RGBA16 (RGBA5551)
+                ((v16 >> 11) & 0b11111) * 255 // 31,
+                ((v16 >> 6) & 0b11111) * 255 // 31,
+                ((v16 >> 1) & 0b11111) * 255 // 31,
+                (v16 & 1) * 255),
+            (3,0): bgra(ia4, ia4, ia4, (v4 & 1) * 255), # IA4
+            (3,1): bgra(ia8, ia8, ia8, (v8 & 0xF) * 255 // 15), # IA8
+            (3,2): bgra(v16 >> 8, v16 >> 8, v16 >> 8, v16 & 0xFF), # IA16
+            (4,0): bgra(i4, i4, i4, i4), # I4
+            (4,1): bgra(v8, v8, v8, v8), # I8
+        }
+    return texelTables
+
+def decodeTextureJob(job):
+    """
+    Decode a texture from a job made by Tile.getDecodeJob, returns (tga file data, write_error_encountered)
+    May be called in worker processes, must not use bpy
+    """
+    (   texFmt, texSiz, rWidth, rHeight,
+        clipX, clipY, w, h,
+        texelData, paletteData,
+        replicateTexMirror, path
+    ) = job
+    tile = Tile()
+    tile.texFmt, tile.texSiz = texFmt, texSiz
+    tile.rWidth, tile.rHeight = rWidth, rHeight
+    tile.clip[0], tile.clip[1] = clipX, clipY
+    # texel data is at the start of segment 0, palette data at the start of segment 1
+    tile.data, tile.palette = 0x00000000, 0x01000000
+    tile.current_texture_file_path = path
+    segment = [texelData, paletteData] + [b''] * 14
+    tgaData = tile.encodeTGA(segment, w, h, replicateTexMirror)
+    return tgaData, tile.write_error_encountered
+
+def getTextureCacheKey(job):
+    """Hash of everything the texture file content depends on, from a job made by Tile.getDecodeJob"""
+    (   texFmt, texSiz, rWidth, rHeight,
+        clipX, clipY, w, h,
+        texelData, paletteData,
+        replicateTexMirror, path
+    ) = job
+    key = hashlib.sha1()
+    key.update(pack('>BBHHBBB', texFmt, texSiz, rWidth, rHeight, clipX, clipY, replicateTexMirror))
+    key.update(texelData)
+    key.update(paletteData)
+    return key.hexdigest()
+
+@functools.lru_cache(maxsize=256)
+def calculateTileSize(texFmt, texSiz, lineSize, rect, scale, clipX, clipY, maskX, maskY, tshiftX, tshiftY, enableToon, replicateTexMirrorBlender):
+    """
+    Tile dimensions and uv transform from a tile descriptor, see Tile.calculateSize
+    Returns (width, height, rWidth, rHeight, shift, ratio, offset), the arguments are left untouched
+    so the result only depends on them and can be memoized
+    """
+    log = getLogger('calculateTileSize')
+    maxTxl, lineShift = 0, 0
+    # fixme what is maxTxl? this whole function is rather mysterious, not sure how/why it works
+    #texFmt 0 2 texSiz 0
+    # RGBA CI 4b
+    if (texFmt == 0 or texFmt == 2) and texSiz == 0:
+        maxTxl = 4096
+        lineShift = 4
+    # texFmt 3 4 texSiz 0
+    # IA I 4b
+    elif (texFmt == 3 or texFmt == 4) and texSiz == 0:
+        maxTxl = 8192
+        lineShift = 4
+    # texFmt 0 2 texSiz 1
+    # RGBA CI 8b
+    elif (texFmt == 0 or texFmt == 2) and texSiz == 1:
+        maxTxl = 2048
+        lineShift = 3
+    # texFmt 3 4 texSiz 1
+    # IA I 8b
+    elif (texFmt == 3 or texFmt == 4) and texSiz == 1:
+        maxTxl = 4096
+        lineShift = 3
+    # texFmt 0 3 texSiz 2
+    # RGBA IA 16b
+    elif (texFmt == 0 or texFmt == 3) and texSiz == 2:
+        maxTxl = 2048
+        lineShift = 2
+    # texFmt 2 4 texSiz 2
+    # CI I 16b
+    elif (texFmt == 2 or texFmt == 4) and texSiz == 2:
+        maxTxl = 2048
+        lineShift = 0
+    # texFmt 0 texSiz 3
+    # RGBA 32b
+    elif texFmt == 0 and texSiz == 3:
+        maxTxl = 1024
+        lineShift = 2
+    else:
+        log.warning('Unknown texture format texFmt %d texSiz %d', texFmt, texSiz)
+    lineWidth = lineSize << lineShift
+    rectX, rectY, rectZ, rectW = rect
+    tileWidth = rectZ - rectX + 1
+    tileHeight = rectW - rectY + 1
+    maskWidth = 1 << maskX
+    maskHeight = 1 << maskY
+    lineHeight = 0
+    if lineWidth > 0:
+        lineHeight = min(int(maxTxl / lineWidth), tileHeight)
+    if maskX > 0 and (maskWidth * maskHeight) <= maxTxl:
+        width = maskWidth
+    elif (tileWidth * tileHeight) <= maxTxl:
+        width = tileWidth
+    else:
+        width = lineWidth
+    if maskY > 0 and (maskWidth * maskHeight) <= maxTxl:
+        height = maskHeight
+    elif (tileWidth * tileHeight) <= maxTxl:
+        height = tileHeight
+    else:
+        height = lineHeight
+    clampWidth, clampHeight = 0, 0
+    if clipX == 1:
+        clampWidth = tileWidth
+    else:
+        clampWidth = width
+    if clipY == 1:
+        clampHeight = tileHeight
+    else:
+        clampHeight = height
+    if maskWidth > width:
+        maskWidth = 1 << powof(width)
+    if maskHeight > height:
+        maskHeight = 1 << powof(height)
+    if clipX & 2 != 0:
+        rWidth = pow2(clampWidth)
+    elif clipX & 1 != 0:
+        rWidth = pow2(maskWidth)
+    else:
+        rWidth = pow2(width)
+    if clipY & 2 != 0:
+        rHeight = pow2(clampHeight)
+    elif clipY & 1 != 0:
+        rHeight = pow2(maskHeight)
+    else:
+        rHeight = pow2(height)
+    shiftX, shiftY = 1.0, 1.0
+    if tshiftX > 10:
+        shiftX = 1 << (16 - tshiftX)
+    elif tshiftX > 0:
+        shiftX /= 1 << tshiftX
+    if tshiftY > 10:
+        shiftY = 1 << (16 - tshiftY)
+    elif tshiftY > 0:
+        shiftY /= 1 << tshiftY
+    ratioX = (scale[0] * shiftX) / rWidth
+    if not enableToon:
+        ratioX /= 32;
+    if clipX & 1 != 0 and replicateTexMirrorBlender:
+        ratioX /= 2
+    ratioY = (scale[1] * shiftY) / rHeight
+    if not enableToon:
+        ratioY /= 32;
+    if clipY & 1 != 0 and replicateTexMirrorBlender:
+        ratioY /= 2
+    return (width, height, rWidth, rHeight,
+        (shiftX, shiftY), (ratioX, ratioY), (rectX, 1.0 + rectY))
+
+class Material:
+    """
+    Material for faces drawn with a texture, see Tile.getMaterial
+    Describes the Blender material, texture and image to create, and how to decode the texture (see decodeTextureJob)
+    """
+    def __init__(self, name, textureName, texturePath, fallbackPath, decodeJob, width, height, clip, use_transparency):
+        self.name, self.textureName = name, textureName
+        # texture file, and where to write it instead if decoding it failed
+        self.texturePath, self.fallbackPath = texturePath, fallbackPath
+        self.decodeJob = decodeJob
+        # image size, twice the texture size along mirrored axes if replicateTexMirrorBlender
+        self.width, self.height = width, height
+        self.clip = clip
+        self.use_transparency = use_transparency
+
+
+class Tile:
+    def __init__(self):
+        self.current_texture_file_path = None
+        self.texFmt, self.texBytes = 0x00, 0
+        self.width, self.height = 0, 0
+        self.rWidth, self.rHeight = 0, 0
+        self.texSiz = 0
+        self.lineSize = 0
+        self.rect = [0, 0, 0, 0]
+        self.scale = [1, 1]
+        self.ratio = [1, 1]
+        self.clip = [0, 0]
+        self.mask = [0, 0]
+        self.shift = [0, 0]
+        self.tshift = [0, 0]
+        self.offset = [0, 0]
+        self.data = 0x00000000
+        self.palette = 0x00000000
+
+    def getState(self):
+        return (
+            self.current_texture_file_path,
+            self.texFmt, self.texBytes, self.texSiz, self.lineSize,
+            self.width, self.height, self.rWidth, self.rHeight,
+            tuple(self.rect), tuple(self.scale), tuple(self.ratio), tuple(self.clip),
+            tuple(self.mask), tuple(self.shift), tuple(self.tshift), tuple(self.offset),
+            self.data, self.palette
+        )
+
+    def setState(self, state):
+        (
+            self.current_texture_file_path,
+            self.texFmt, self.texBytes, self.texSiz, self.lineSize,
+            self.width, self.height, self.rWidth, self.rHeight,
+            rect, scale, ratio, clip, mask, shift, tshift, offset,
+            self.data, self.palette
+        ) = state
+        self.rect, self.scale, self.ratio, self.clip = list(rect), list(scale), list(ratio), list(clip)
+        self.mask, self.shift, self.tshift, self.offset = list(mask), list(shift), list(tshift), list(offset)
+
+    def getFormatName(self):
+        fmt = ['RGBA','YUV','CI','IA','I']
+        siz = ['4','8','16','32']
+        return '%s%s' % (
+            fmt[self.texFmt] if self.texFmt < len(fmt) else 'UnkFmt',
+            siz[self.texSiz] if self.texSiz < len(siz) else '_UnkSiz'
+        )
+
+    def getMaterial(self, segment, use_transparency, prefix="", textureDecodings=None):
+        """
+        Descriptor of the material drawing with the tile makes, or None if it failed
+        Sets current_texture_file_path, the texture file the material uses
+        textureDecodings is the texture files named so far, see F3DZEX.textureDecodings
+        """
+        log = getLogger('Tile.getMaterial')
+        fmtName = self.getFormatName()
+        #Noka here
+        extrastring = ""
+        w = self.rWidth
+        if int(self.clip[0]) & 1 != 0:
+            if replicateTexMirrorBlender:
+                w <<= 1
+            if enableTexMirrorSharpOcarinaTags:
+                extrastring += "#MirrorX"
+        h = self.rHeight
+        if int(self.clip[1]) & 1 != 0:
+            if replicateTexMirrorBlender:
+                h <<= 1
+            if enableTexMirrorSharpOcarinaTags:
+                extrastring += "#MirrorY"
+        if int(self.clip[0]) & 2 != 0 and enableTexClampSharpOcarinaTags:
+            extrastring += "#ClampX"
+        if int(self.clip[1]) & 2 != 0 and enableTexClampSharpOcarinaTags:
+            extrastring += "#ClampY"
+        palettestring = ('_pal%08X' % self.palette) if self.texFmt == 2 else ''
+        # materials are per render state (see getMaterialKey), the first decoding of some data keeps the plain name
+        # and the same data decoded to another size or mirrored differently gets its own file
+        sizestring = ""
+        if textureDecodings is not None:
+            decoding = (self.rWidth, self.rHeight, w, h)
+            if textureDecodings.setdefault((fmtName, self.data, palettestring, extrastring), decoding) != decoding:
+                sizestring = '_%dx%d' % (self.rWidth, self.rHeight)
+                if w != self.rWidth:
+                    sizestring += '_mirrorX'
+                if h != self.rHeight:
+                    sizestring += '_mirrorY'
+        self.current_texture_file_path = (
+            '%s/textures/%s%s_%08X%s%s%s.tga'
+            % (fpath, prefix, fmtName, self.data, palettestring, sizestring, extrastring))
+        try:
+            oldNameDir, oldNameBase = os.path.split(self.current_texture_file_path)
+            return Material(
+                prefix + ('mtl_%08X' % self.data),
+                prefix + ('tex_%s_%08X' % (fmtName, self.data)),
+                self.current_texture_file_path,
+                oldNameDir + '/' + prefix + 'fallback_' + oldNameBase,
+                self.getDecodeJob(segment, w, h),
+                w, h, (int(self.clip[0]), int(self.clip[1])),
+                use_transparency
+            )
+        except:
+            log.exception('Failed to describe material mtl_%08X', self.data)
+            return None
+
+    def getDecodeJob(self, segment, w, h):
+        """Everything encodeTGA needs with the texture data copied out of the segments, see decodeTextureJob"""
+        if self.texSiz <= 3:
+            bpp = (0.5,1,2,4)[self.texSiz] # bytes (not bits) per pixel
+        else:
+            bpp = 4
+        seg, offset = splitOffset(self.data)
+        texelData = segment[seg][offset:offset + int(self.rHeight * self.rWidth * bpp)] if seg < 16 else b''
+        seg, offset = splitOffset(self.palette)
+        palSize = 16 if self.texSiz == 0 else 256
+        paletteData = segment[seg][offset:offset + palSize * 2] if self.texFmt == 2 and seg < 16 else b''
+        return (
+            self.texFmt, self.texSiz, self.rWidth, self.rHeight,
+            int(self.clip[0]), int(self.clip[1]), w, h,
+            texelData, paletteData,
+            replicateTexMirrorBlender, self.current_texture_file_path
+        )
+
+    def encodeTGA(self, segment, w, h, replicateTexMirror):
+        log = getLogger('Tile.encodeTGA')
+        self.write_error_encountered = False
+        file = io.BytesIO()
+        if self.texFmt == 2:
+            if self.texSiz not in (0, 1):
+                log.error('Unknown texture format %d with pixel size %d', self.texFmt, self.texSiz)
+            p = 16 if self.texSiz == 0 else 256
+            file.write(pack("<BBBHHBHHHHBB",
+                0,  # image comment length
+                1,  # 1 = paletted
+                1,  # 1 = indexed uncompressed colors
+                0,  # index of first palette entry (?)
+                p,  # amount of entries in palette
+                32, # bits per pixel
+                0,  # bottom left X (?)
+                0,  # bottom left Y (?)
+                w,  # width
+                h,  # height
+                8,  # pixel depth
+                8   # 8 bits alpha hopefully?
+            ))
+            self.writePalette(file, segment, p)
+        else:
+            file.write(pack("<BBBHHBHHHHBB",
+                0, # image comment length
+                0, # no palette
+                2, # uncompressed Truecolor (24-32 bits)
+                0, # irrelevant, no palette
+                0, # irrelevant, no palette
+                0, # irrelevant, no palette
+                0, # bottom left X (?)
+                0, # bottom left Y (?)
+                w, # width
+                h, # height
+                32,# pixel depth
+                8  # 8 bits alpha (?)
+            ))
+        self.writeImageData(file, segment, replicateTexMirror)
+        return file.getvalue()
+
+    def getMaterialKey(self, use_transparency, prefix):
+        """Key identifying the material getMaterial() would describe from the current tile state"""
+        return (
+            self.data, self.palette if self.texFmt == 2 else None,
+            self.texFmt, self.texSiz,
+            int(self.clip[0]), int(self.clip[1]),
+            self.rWidth, self.rHeight,
+            use_transparency, prefix
+        )
+
+    def calculateSize(self):
+        (self.width, self.height, self.rWidth, self.rHeight,
+            shift, ratio, offset) = calculateTileSize(
+                self.texFmt, self.texSiz, self.lineSize,
+                tuple(self.rect), tuple(self.scale),
+                int(self.clip[0]), int(self.clip[1]),
+                int(self.mask[0]), int(self.mask[1]),
+                int(self.tshift[0]), int(self.tshift[1]),
+                enableToon, replicateTexMirrorBlender)
+        self.shift = list(shift)
+        self.ratio = list(ratio)
+        self.offset = list(offset)
+
+    def writePalette(self, file, segment, palSize):
+        log = getLogger('Tile.writePalette')
+        if not validOffset(segment, self.palette + palSize * 2 - 1):
+            log.error('Segment offsets 0x%X-0x%X are invalid, writing black palette to %s (has the segment data been loaded?)' % (self.palette, self.palette + palSize * 2 - 1, self.current_texture_file_path))
+            file.write(bytes(palSize * 4))
+            self.write_error_encountered = True
+            return
+        file.write(self.decodePalette(segment, palSize).tobytes())
+
+    def decodePalette(self, segment, palSize):
+        """Decode palSize RGBA16 colors at self.palette into an array of shape (palSize, 4) of BGRA bytes"""
+        seg, offset = splitOffset(self.palette)
+        colors = numpy.frombuffer(segment[seg], dtype='>u2', count=palSize, offset=offset)
+        return numpy.take(getTexelTables()[(0,2)], colors, axis=0)
+
+    def writeImageData(self, file, segment, replicateTexMirror):
+        mirrorX = int(self.clip[0]) & 1 != 0 and replicateTexMirror
+        mirrorY = int(self.clip[1]) & 1 != 0 and replicateTexMirror
+        image = self.decodeImageData(segment)
+        if image is None:
+            size = self.rWidth * self.rHeight
+            if mirrorX:
+                size *= 2
+            if mirrorY:
+                size *= 2
+            if self.texFmt == 2: # CI (paletted)
+                file.write(bytes(size))
+            else:
+                file.write(pack(">L", 0x000000FF) * size)
+            self.write_error_encountered = True
+            return
+        if mirrorX:
+            image = numpy.concatenate((image, image[:,::-1]), axis=1)
+        if mirrorY:
+            # top to bottom, then mirrored bottom to top
+            image = numpy.concatenate((image, image[::-1]), axis=0)
+        else:
+            # tga image data starts at the bottom left
+            image = image[::-1]
+        file.write(image.tobytes())
+
+    def decodeImageData(self, segment):
+        """
+        Decode the texels of the whole texture at once
+        Returns an array of shape (rHeight, width) of palette indices for CI, or
+        of shape (rHeight, width, 4) of BGRA bytes otherwise, top row first
+        Returns None if the texture can't be decoded
+        """
+        log = getLogger('Tile.decodeImageData')
+        if self.texSiz <= 3:
+            bpp = (0.5,1,2,4)[self.texSiz] # bytes (not bits) per pixel
+        else:
+            log.warning('Unknown texSiz %d for texture %s, defaulting to 4 bytes per pixel' % (self.texSiz, self.current_texture_file_path))
+            bpp = 4
+        lineSize = self.rWidth * bpp
+        if not validOffset(segment, self.data + int(self.rHeight * lineSize) - 1):
+            log.error('Segment offsets 0x%X-0x%X are invalid, writing default fallback colors to %s (has the segment data been loaded?)' % (self.data, self.data + int(self.rHeight * lineSize) - 1, self.current_texture_file_path))
+            return None
+        if (self.texFmt,self.texSiz) not in (
+            (0,2), (0,3), # RGBA16, RGBA32
+            #(1,-1), # YUV ? "not used in z64 games"
+            (2,0), (2,1), # CI4, CI8
+            (3,0), (3,1), (3,2), # IA4, IA8, IA16
+            (4,0), (4,1), # I4, I8
+        ):
+            log.error('Unknown fmt/siz combination %d/%d (%s?)', self.texFmt, self.texSiz, self.getFormatName())
+            return None
+        seg, offset = splitOffset(self.data)
+        # a 4 bits texture 1 texel wide has 0 bytes per line, hence no texels
+        lineBytes = int(lineSize)
+        width = int(lineBytes / bpp)
+        if self.texFmt == 0 and self.texSiz == 3: # RGBA32
+            texels = numpy.frombuffer(segment[seg], dtype=numpy.uint8, count=self.rHeight * lineBytes, offset=offset)
+            return texels.reshape(self.rHeight, width, 4)[:,:,(2,1,0,3)] # RGBA -> BGRA
+        texels = numpy.frombuffer(segment[seg], dtype='>u%d' % max(1, bpp), count=int(self.rHeight * lineBytes / max(1, bpp)), offset=offset)
+        if bpp == 0.5:
+            # split each byte into its two texels, high nibble first
+            texels = numpy.stack((texels >> 4, texels & 0xF), axis=-1)
+        texels = texels.reshape(self.rHeight, width)
+        if self.texFmt == 2: # CI
+            return texels.astype(numpy.uint8)
+        return numpy.take(getTexelTables()[(self.texFmt,self.texSiz)], texels, axis=0)
+
+
+# vertex as stored in segment data
+vertexDtype = numpy.dtype([
+    ('pos', '>i2', 3),
+    ('flag', '>u2'),
+    ('uv', '>i2', 2),
+    ('normalColor', 'u1', 4), # normal (signed) or color, depending on G_LIGHTING
+])
+
+# vertex as loaded in F3DZEX.vbuf, in blender coordinates
+vertexBufferDtype = numpy.dtype([
+    ('pos', 'f4', 3),
+    ('uv', 'f4', 2),
+    ('normal', 'f4', 3),
+    ('color', 'f8', 4),
+    ('limb', 'i2'), # index of the limb the vertex belongs to, or -1
+])
+
+
+class Mesh:
+    """
+    Geometry read from a display list, stored in flat typed arrays
+    Faces are triangles, loop data (uvs, colors, normals, limbs) has 3 entries per face
+    materials are Material descriptors, hierarchy is the Hierarchy the mesh is skinned to, if any
+    """
+    def __init__(self):
+        # 3 floats per vertex
+        self.verts = array('f')
+        # position -> index of its first occurrence in verts
+        self.vertsIndex = {}
+        # 3 vertex indices per face
+        self.faces = array('i')
+        self.faces_use_smooth = array('b')
+        # index in materials per face, -1 for no material
+        self.faces_material = array('i')
+        self.materials = []
+        # 2 floats per loop
+        self.uvs = array('f')
+        # 3 floats per loop, 4 if vertex alpha is used
+        self.colorSize = 4 if checkUseVertexAlpha() else 3
+        self.colors = array('f')
+        # import normals, 3 floats per loop
+        self.normals = array('f')
+        # limb index per loop, -1 for none
+        self.loops_limb = array('i')
+
+    def getMaterialIndex(self, material):
+        if not material:
+            return -1
+        if material not in self.materials:
+            self.materials.append(material)
+        return self.materials.index(material)
+
+    def getMaterialSlots(self):
+        """
+        Materials for the mesh slots and the slot index of each face
+        Faces without material use an empty slot after the materials, if there are materials
+        """
+        faces_slot = numpy.array(self.faces_material, dtype=numpy.int32)
+        slots = list(self.materials)
+        if slots and (faces_slot < 0).any():
+            faces_slot = numpy.where(faces_slot < 0, len(slots), faces_slot)
+            slots.append(None)
+        else:
+            faces_slot = numpy.maximum(faces_slot, 0)
+        return slots, faces_slot
+
+    def getVertexGroups(self):
+        """
+        Vertices skinned to each limb, as limb index -> sorted array of unique vertex indices
+        A vertex shared by loops of several limbs is in each of their groups
+        """
+        loops_limb = numpy.array(self.loops_limb, dtype=numpy.int64)
+        faces = numpy.array(self.faces, dtype=numpy.int64)
+        skinned = loops_limb >= 0
+        nverts = max(1, len(self.verts) // 3)
+        # unique (limb, vertex) pairs, sorted by limb then vertex
+        keys = numpy.unique(loops_limb[skinned] * nverts + faces[skinned])
+        limbs, verts = keys // nverts, keys % nverts
+        groups = {}
+        for limb in numpy.unique(limbs).tolist():
+            start, end = numpy.searchsorted(limbs, [limb, limb + 1])
+            groups[limb] = verts[start:end]
+        return groups
+
+    def getSize(self):
+        """
+        Amount of vertices, faces and materials, for truncate()
+        """
+        return len(self.verts) // 3, len(self.faces_material), len(self.materials)
+
+    def truncate(self, size):
+        """
+        Drop everything added after getSize() returned size
+        """
+        nverts, nfaces, nmaterials = size
+        for i in range(nverts * 3, len(self.verts), 3):
+            self.vertsIndex.pop(tuple(self.verts[i:i+3]), None)
+        del self.verts[nverts * 3:]
+        del self.faces[nfaces * 3:]
+        del self.faces_use_smooth[nfaces:]
+        del self.faces_material[nfaces:]
+        del self.materials[nmaterials:]
+        del self.uvs[nfaces * 6:]
+        del self.colors[nfaces * 3 * self.colorSize:]
+        del self.normals[nfaces * 9:]
+        del self.loops_limb[nfaces * 3:]
+
+    def finish(self, name_format, hierarchy, offset, use_normals, prefix=""):
+        """
+        Name the mesh once its display list has been read, returns False if it is empty (has no faces)
+        """
+        log = getLogger('Mesh.finish')
+        nverts, nfaces, nmaterials = self.getSize()
+        if nfaces == 0:
+            log.trace('Skipping empty mesh %08X', offset)
+            if nverts:
+                log.warning('Discarding unused vertices, no faces')
+            return False
+        log.trace('Finished mesh %08X', offset)
+        self.name = prefix + (name_format % ('me_%08X' % offset))
+        self.ob_name = prefix + (name_format % ('ob_%08X' % offset))
+        self.hierarchy = hierarchy
+        self.use_normals = use_normals
+        return True
+
+
+class Limb:
+    def __init__(self):
+        self.parent, self.child, self.sibling = -1, -1, -1
+        # float32 like the vertices positions it is added to
+        self.pos = numpy.zeros(3, dtype=numpy.float32)
+        self.near, self.far = 0x00000000, 0x00000000
+        self.poseLoc = [0, 0, 0]
+
+    def read(self, segment, offset, actuallimb, BoneCount):
+        seg, offset = splitOffset(offset)
+
+        rot_offset = offset & 0xFFFFFF
+        rot_offset += (0 * (BoneCount * 6 + 8));
+
+        self.pos[0] = unpack_from(">h", segment[seg], offset)[0]
+        self.pos[2] = unpack_from(">h", segment[seg], offset + 2)[0]
+        self.pos[1] = -unpack_from(">h", segment[seg], offset + 4)[0]
+        global scaleFactor
+        self.pos *= scaleFactor
+        self.child = unpack_from("b", segment[seg], offset + 6)[0]
+        self.sibling = unpack_from("b", segment[seg], offset + 7)[0]
+        self.near = unpack_from(">L", segment[seg], offset + 8)[0]
+        self.far = unpack_from(">L", segment[seg], offset + 12)[0]
+
+        self.poseLoc[0] = unpack_from(">h", segment[seg], rot_offset)[0]
+        self.poseLoc[2] = unpack_from(">h", segment[seg], rot_offset + 2)[0]
+        self.poseLoc[1] = unpack_from(">h", segment[seg], rot_offset + 4)[0]
+        getLogger('Limb.read').trace("      Limb %r: %f,%f,%f", actuallimb, self.poseLoc[0], self.poseLoc[2], self.poseLoc[1])
+
+class Hierarchy:
+    def __init__(self):
+        self.name, self.offset = "", 0x00000000
+        self.limbCount, self.dlistCount = 0x00, 0x00
+        self.limb = []
+        self.boneNames = []
+
+    def read(self, segment, offset, prefix=""):
+        log = getLogger('Hierarchy.read')
+        self.dlistCount = None
+        if not validOffset(segment, offset + 5):
+            log.error('Invalid segmented offset 0x%X for hierarchy' % (offset + 5))
+            return False
+        if not validOffset(segment, offset + 9):
+            log.warning('Invalid segmented offset 0x%X for hierarchy (incomplete header), still trying to import ignoring dlistCount' % (offset + 9))
+            self.dlistCount = 1
+        self.name = prefix + ("sk_%08X" % offset)
+        self.offset = offset
+        seg, offset = splitOffset(offset)
+        limbIndex_offset = unpack_from(">L", segment[seg], offset)[0]
+        if not validOffset(segment, limbIndex_offset):
+            log.error("        ERROR:  Limb index table 0x%08X out of range" % limbIndex_offset)
+            return False
+        limbIndex_seg, limbIndex_offset = splitOffset(limbIndex_offset)
+        self.limbCount = segment[seg][offset + 4]
+        # names of the bones and vertex groups of each limb
+        self.boneNames = ["limb_%02i" % i for i in range(self.limbCount)]
+        if not self.dlistCount:
+            self.dlistCount = segment[seg][offset + 8]
+        for i in range(self.limbCount):
+            limb_offset = unpack_from(">L", segment[limbIndex_seg], limbIndex_offset + 4 * i)[0]
+            limb = Limb()
+            limb.index = i
+            self.limb.append(limb)
+            if validOffset(segment, limb_offset + 12):
+                limb.read(segment, limb_offset, i, self.limbCount)
+            else:
+                log.error("        ERROR:  Limb 0x%02X offset 0x%08X out of range" % (i, limb_offset))[0]
+        self.limb[0].pos = numpy.zeros(3, dtype=numpy.float32)
+        self.initLimbs(0x00)
+        return True
+
+    def initLimbs(self, i):
+        if (self.limb[i].child > -1 and self.limb[i].child != i):
+            self.limb[self.limb[i].child].parent = i
+            self.limb[self.limb[i].child].pos += self.limb[i].pos
+            self.initLimbs(self.limb[i].child)
+        if (self.limb[i].sibling > -1 and self.limb[i].sibling != i):
+            self.limb[self.limb[i].sibling].parent = self.limb[i].parent
+            self.limb[self.limb[i].sibling].pos += self.limb[self.limb[i].parent].pos
+            self.initLimbs(self.limb[i].sibling)
+
+    def getMatrixLimb(self, offset):
+        j = 0
+        index = (offset & 0x00FFFFFF) / 0x40
+        for i in range(self.limbCount):
+            if self.limb[i].near != 0:
+                if (j == index):
+                    return self.limb[i]
+                j += 1
+        return self.limb[0]
+
+
+class Animation:
+    """
+    Animation read from its header at offset, values are as stored (s16, rotations are 0x10000 for a full turn):
+    rotations[frame, limb] is the (x, y, z) rotation of a limb, only set where rotationsValid[frame, limb],
+    rootLocation[frame] is the (x, y, z) location of the root limb
+    """
+    def __init__(self, offset, duration):
+        self.offset = offset
+        # frame count found by F3DZEX.locateAnimations, used to name the animation
+        self.duration = duration
+        self.frameCount = 0
+        self.rotations = numpy.zeros((0, 0, 3), dtype=numpy.int16)
+        self.rotationsValid = numpy.zeros((0, 0), dtype=bool)
+        self.rootLocation = numpy.zeros((0, 3), dtype=numpy.int16)
+
+    def read(self, segment, limbCount):
+        log = getLogger('Animation.read')
+        if not validOffset(segment, self.offset):
+            log.warning('Skipping invalid animation offset 0x%X', self.offset)
+            return False
+        seg, offset = splitOffset(self.offset)
+        data = segment[seg]
+        if offset + 14 > len(data):
+            log.warning('Skipping animation 0x%X, its header is incomplete', self.offset)
+            return False
+
+        frameTotal = unpack_from(">h", data, offset)[0]
+        rot_vals_addr = unpack_from(">L", data, offset + 4)[0] & 0xFFFFFF
+        RotIndexoffset = unpack_from(">L", data, offset + 8)[0] & 0xFFFFFF
+        Limit = unpack_from(">H", data, offset + 12)[0] # todo no idea what this is
+        if RotIndexoffset + 6 > len(data):
+            log.warning('Skipping animation 0x%X, its rotation indices are out of bounds', self.offset)
+            return False
+
+        rot_vals_max_length = int ((RotIndexoffset - rot_vals_addr) / 2)
+        if rot_vals_max_length < 0:
+            log.info('rotation indices (animation data) is located before indexed rotation values, this is weird but fine')
+            rot_vals_max_length = (len(data) - rot_vals_addr) // 2
+        # indexed values table, bounded by the indices table (if it comes after) and the segment end
+        rot_vals_length = (len(data) - rot_vals_addr) // 2
+        if rot_vals_max_length:
+            rot_vals_length = min(rot_vals_length, rot_vals_max_length)
+        rot_vals_length = max(0, rot_vals_length)
+        rot_vals = numpy.frombuffer(data, dtype='>i2', count=rot_vals_length, offset=rot_vals_addr) if rot_vals_length else numpy.zeros(0, dtype='>i2')
+
+        # (x, y, z) indices in the rotations table, of the root location then of each limb rotation
+        # indices >= Limit are of values changing each frame (the frame is added to them), other values are constant
+        limbsInTable = min(limbCount, max(0, (len(data) - RotIndexoffset - 6) // 6))
+        if limbsInTable < limbCount:
+            log.trace('Ignoring bones %d and after in animation 0x%X, rotation table does not have that many entries', limbsInTable, self.offset)
+        indices = numpy.frombuffer(data, dtype='>i2', count=3 + 3 * limbsInTable, offset=RotIndexoffset).astype(numpy.int64).reshape(-1, 3)
+        log.trace("       %d Frames %d still values %f tracks",frameTotal, Limit, ((rot_vals_max_length - Limit) / frameTotal) if frameTotal else 0) # what is this debug message?
+
+        # at least one frame is read, like the game does
+        frames = max(1, frameTotal)
+        frameIndices = indices + (indices >= Limit) * numpy.arange(frames).reshape(-1, 1, 1)
+        valid = (frameIndices >= 0) & (frameIndices < rot_vals_length)
+        values = rot_vals[numpy.where(valid, frameIndices, 0)] if rot_vals_length else numpy.zeros(frameIndices.shape, dtype=numpy.int16)
+        values = numpy.where(valid, values, 0).astype(numpy.int16)
+
+        self.frameCount = frameTotal
+        # missing root location values are 0
+        self.rootLocation = values[:, 0]
+        self.rotations = numpy.zeros((frames, limbCount, 3), dtype=numpy.int16)
+        self.rotationsValid = numpy.zeros((frames, limbCount), dtype=bool)
+        self.rotations[:, :limbsInTable] = values[:, 1:]
+        # a limb rotation is ignored if any of its values is missing
+        self.rotationsValid[:, :limbsInTable] = valid[:, 1:].all(axis=2)
+        if log.isEnabledFor(logging_trace_level) and not self.rotationsValid[:, :limbsInTable].all():
+            log.trace('Ignoring %d bone rotations in animation 0x%X, rotation table did not have the entries', (~self.rotationsValid[:, :limbsInTable]).sum(), self.offset)
+        return True
+
+
+def readAnimation(path, offset, duration, limbCount):
+    """
+    Read the animation at offset from the file at path holding the data of its segment (see F3DZEX.segmentPaths),
+    for building an animation after the import without parsing the whole file again
+    Returns None if the animation could not be read (see Animation.read)
+    """
+    segment = [[] for i in range(16)]
+    seg, _ = splitOffset(offset)
+    with open(path, 'rb') as file:
+        segment[seg] = file.read()
+    animation = Animation(offset, duration)
+    if not animation.read(segment, limbCount):
+        return None
+    return animation
+
+
+def findAnimationHeaders(data, limbCount):
+    """
+    (offset, frame count) of the animation headers in data, for skeletons of up to limbCount limbs
+    Candidates are the 4-aligned headers ffff0000 06rrrrrr 06iiiiii llll0000 (values table, indices table, Limit)
+    with both tables starting in data, they are kept if the indices of the root and limbs point inside the values table
+    for every frame (only the indices before the header are checked if the header follows them)
+    """
+    log = getLogger('findAnimationHeaders')
+    size = len(data)
+    if size < 16:
+        return []
+    words = numpy.frombuffer(data, dtype='>u4', count=size // 4).astype(numpy.int64)
+    # header words at every 4-aligned offset, as views of words
+    w0, w1, w2, w3 = words[:-3], words[1:-2], words[2:-1], words[3:]
+    # fixme first byte of w0 == 0 but should be first byte of ffff
+    # fixme frames > 1 but why not 1 (or 0)
+    candidates = numpy.flatnonzero(
+        ((w0 & 0xFF00FFFF) == 0) & (((w0 >> 16) & 0xFF) > 1)
+        & ((w1 >> 24) == 0x06) & ((w1 & 0xFFFFFF) < size)
+        & ((w2 >> 24) == 0x06) & ((w2 & 0xFFFFFF) < size)
+        & ((w3 & 0xFFFF) == 0)
+    )
+    offsets = candidates * 4
+    # fixme it's two bytes, not one
+    frames = (w0[candidates] >> 16) & 0xFF
+    valuesAddr = w1[candidates] & 0xFFFFFF
+    indicesAddr = w2[candidates] & 0xFFFFFF
+    limit = w3[candidates] >> 16
+
+    # values table length, bounded like Animation.read does
+    valuesLength = (size - valuesAddr) // 2
+    valuesMaxLength = numpy.trunc((indicesAddr - valuesAddr) / 2).astype(numpy.int64)
+    valuesLength = numpy.where(valuesMaxLength > 0, numpy.minimum(valuesLength, valuesMaxLength), valuesLength)
+
+    # (x, y, z) index entries to check, the root and each limb
+    maxEntries = limbCount + 1
+    entries = numpy.full(len(candidates), maxEntries, dtype=numpy.int64)
+    before = indicesAddr < offsets
+    entries[before] = numpy.minimum(maxEntries, (offsets[before] - indicesAddr[before]) // 6)
+    valid = (entries > 0) & (indicesAddr + 6 * entries <= size)
+    dataBytes = numpy.frombuffer(data, dtype=numpy.uint8)
+    positions = numpy.minimum(indicesAddr[:, numpy.newaxis] + 2 * numpy.arange(3 * maxEntries), size - 2)
+    indices = (dataBytes[positions].astype(numpy.int64) << 8) | dataBytes[positions + 1]
+    indices = numpy.where(indices >= 0x8000, indices - 0x10000, indices)
+    # indices >= Limit are animated, they use the frame count values after them
+    last = indices + (indices >= limit[:, numpy.newaxis]) * (frames[:, numpy.newaxis] - 1)
+    checked = numpy.arange(3 * maxEntries) < 3 * entries[:, numpy.newaxis]
+    valid &= (~checked | ((indices >= 0) & (last < valuesLength[:, numpy.newaxis]))).all(axis=1)
+
+    if not valid.all():
+        log.info('Ignoring %d animation headers with indices out of their values table', (~valid).sum())
+        for offset in offsets[~valid].tolist():
+            log.trace('Ignoring animation header at 0x%X', offset)
+    return list(zip(offsets[valid].tolist(), frames[valid].tolist()))
+
+
+class IntervalSet:
+    """
+    Sorted disjoint intervals [start, end] of integer offsets, intervals overlapping or touching are merged when added
+    """
+    def __init__(self):
+        self.starts, self.ends = [], []
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def add(self, start, end):
+        if end < start:
+            return
+        lo = bisect.bisect_left(self.ends, start - 1)
+        hi = bisect.bisect_right(self.starts, end + 1)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def contains(self, offset):
+        i = bisect.bisect_right(self.starts, offset) - 1
+        return i >= 0 and offset <= self.ends[i]
+
+    def nextStart(self, offset):
+        """
+        Start of the first interval starting at or after offset, or None
+        """
+        i = bisect.bisect_left(self.starts, offset)
+        return self.starts[i] if i < len(self.starts) else None
+
+
+class DisplayListContext:
+    """
+    State of a display list being read by F3DZEX.buildDisplayList, shared by the opcode handlers,
+    and frame of the display list call stack
+    """
+    def __init__(self, hierarchy, limb, offset, data, commands, endOffset, mesh_name_format, skipAlreadyRead, extraLenient, log):
+        self.hierarchy, self.limb, self.offset = hierarchy, limb, offset
+        self.segment, self.startOffset = splitOffset(offset)
+        self.data = data
+        # commands[index] is the next command to read, reading stops at indexEnd
+        self.commands = commands
+        self.phase = self.startOffset & 7
+        self.index = self.startOffset >> 3
+        self.indexEnd = min(len(commands), (endOffset - self.phase + 7) >> 3)
+        self.endOffset = endOffset
+        # offset of the command that ended the display list, None while reading it
+        self.end = None
+        # key to record the effects of the display list under once it ends, see F3DZEX.callDisplayList
+        self.memoKey = None
+        self.firstMesh = 0
+        self.mesh_name_format = mesh_name_format
+        self.skipAlreadyRead, self.extraLenient = skipAlreadyRead, extraLenient
+        self.log = log
+        self.mesh = Mesh()
+        self.has_tex = False
+        self.material = None
+        if hierarchy:
+            self.matrix = [limb]
+        else:
+            self.matrix = [None]
+
+    def stop(self):
+        """
+        Stop reading the display list at the next command, without recording its effects
+        """
+        self.memoKey = None
+        self.indexEnd = self.index
+        self.endOffset = self.phase | (self.index << 3)
+
+
+class Background:
+    """
+    JFIF background image of a pre-rendered room, see F3DZEX.importJFIF
+    The addon shows it on a plane, offset along y by index
+    """
+    def __init__(self, name, fileName, jfifData, width, height, index):
+        self.name, self.fileName = name, fileName
+        self.jfifData = jfifData
+        self.width, self.height = width, height
+        self.index = index
+
+
+# https://wiki.cloudmodding.com/oot/F3DZEX#RSP_Geometry_Mode
+# flags tracked in F3DZEX.geometryMode, names are only used for logging
+geometryModeMasks = {
+    'G_ZBUFFER':            0b00000000000000000000000000000001,
+    'G_SHADE':              0b00000000000000000000000000000100, # used by 0x05/0x06 for mesh.faces_use_smooth
+    'G_CULL_FRONT':         0b00000000000000000000001000000000, # todo set culling (not possible per-face or per-material or even per-object apparently) / SharpOcarina tags
+    'G_CULL_BACK':          0b00000000000000000000010000000000, # todo same
+    'G_FOG':                0b00000000000000010000000000000000,
+    'G_LIGHTING':           0b00000000000000100000000000000000,
+    'G_TEXTURE_GEN':        0b00000000000001000000000000000000, # todo billboarding?
+    'G_TEXTURE_GEN_LINEAR': 0b00000000000010000000000000000000, # todo billboarding?
+    'G_SHADING_SMOOTH':     0b00000000001000000000000000000000, # used by 0x05/0x06 for mesh.faces_use_smooth
+    'G_CLIPPING':           0b00000000100000000000000000000000,
+}
+geometryModeKnownMask = functools.reduce(lambda a, b: a | b, geometryModeMasks.values())
+G_SHADE = geometryModeMasks['G_SHADE']
+G_LIGHTING = geometryModeMasks['G_LIGHTING']
+G_SHADING_SMOOTH = geometryModeMasks['G_SHADING_SMOOTH']
+
+def getGeometryModeNames(geometryMode):
+    return [flagName for flagName, flagMask in geometryModeMasks.items() if geometryMode & flagMask]
+
+
+class F3DZEX:
+    """
+    Reads the segments data into the intermediate representation:
+    hierarchy (Hierarchy skeletons), materials (Material descriptors), objects (Mesh for each object to create,
+    a mesh appears several times if several objects share it), backgrounds (Background images),
+    animations (Animation) and for Link animations offsetAnims/animFrames/animTotal
+    """
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+
+        self.use_transparency = detectedDisplayLists_use_transparency
+        self.alreadyRead = []
+        self.segment, self.tile  = [], []
+        # segment -> path of the file its data was loaded from, see loadSegment
+        self.segmentPaths = {}
+        self.setGeometryMode(0)
+
+        self.animTotal = 0
+        self.useLinkAnimations = False
+        self.displaylists = []
+
+        for i in range(16):
+            self.alreadyRead.append(IntervalSet())
+            self.segment.append([])
+        for i in range(2):
+            self.tile.append(Tile())
+        # the 32 vertices G_VTX loads into
+        self.vbuf = numpy.zeros(32, dtype=vertexBufferDtype)
+        self.vbuf['limb'] = -1
+        # (segmented offset, count) -> (segment data, vertices), see getVertexBlock
+        self.vertexBlocks = {}
+        self.curTile = 0
+        self.palSize = 0
+        # (called display list, state when called) -> (meshes created, state when returning), see callDisplayList
+        self.subroutineEffects = {}
+        # meshes created by the display lists being read, see callDisplayList
+        self.createdMeshes = None
+        # contexts of the display lists being read, the last one is the one currently read
+        self.callStack = []
+        # render state key (see Tile.getMaterialKey) -> material
+        self.material = {}
+        # materials in the order they were described
+        self.materials = []
+        # (format, data, palette, tags) of a texture file name -> (rWidth, rHeight, w, h) of its first decoding, see Tile.getMaterial
+        self.textureDecodings = {}
+        self.objects = []
+        self.backgrounds = []
+        self.animations = []
+        self.hierarchy = []
+        self.resetCombiner()
+        # (segment, offset & 7) -> (segment data, decoded commands), see getCommands
+        self.commands = {}
+        # opcode -> method handling it in buildDisplayList
+        self.opcodeHandlers = [self.opUnimplemented] * 256
+        for opcodes, handler in (
+            # G_NOOP, G_RDPPIPESYNC, G_SETCOMBINE (todo)
+            ((0x00, 0xE7, 0xFC), self.opNoop),
+            ((0x01,), self.opVtx),
+            ((0x02,), self.opModifyVtx),
+            ((0x05, 0x06), self.opTri),
+            ((0xD7,), self.opTexture),
+            ((0xD8,), self.opPopMtx),
+            ((0xD9,), self.opGeometryMode),
+            ((0xDA,), self.opMtx),
+            ((0xDE,), self.opDl),
+            ((0xDF,), self.opEndDl),
+            ((0xE1,), self.opLodDl),
+            ((0xF0,), self.opLoadTlut),
+            ((0xF2,), self.opSetTileSize),
+            ((0xF4, 0xE4, 0xFE, 0xFF), self.opLogged),
+            ((0xF5,), self.opSetTile),
+            ((0xFA,), self.opSetPrimColor),
+            ((0xFB,), self.opSetEnvColor),
+            ((0xFD,), self.opSetTImg),
+            # G_CULLDL, G_BRANCH_Z, G_SETOTHERMODE_L, G_SETOTHERMODE_H, G_RDPLOADSYNC, G_RDPTILESYNC, G_LOADBLOCK,
+            # not relevant for importing
+            ((0x03, 0x04, 0xE2, 0xE3, 0xE6, 0xE8, 0xF3), self.opNoop),
+        ):
+            for opcode in opcodes:
+                self.opcodeHandlers[opcode] = handler
+
+    def loaddisplaylists(self, path):
+        log = getLogger('F3DZEX.loaddisplaylists')
+        if not os.path.isfile(path):
+            log.info('Did not find %s (use to manually set offsets of display lists to import)', path)
+            self.displaylists = []
+            return
+        try:
+            file = open(path)
+            self.displaylists = file.readlines()
+            file.close()
+            log.info("Loaded the display list list successfully!")
+        except:
+            log.exception('Could not read displaylists.txt')
+
+    def loadSegment(self, seg, path):
+        try:
+            file = open(path, 'rb')
+            self.segment[seg] = file.read()
+            file.close()
+            self.segmentPaths[seg] = path
+        except:
+            getLogger('F3DZEX.loadSegment').error('Could not load segment 0x%02X data from %s' % (seg, path))
+            pass
+
+    def loadOtherSegments(self, filepath):
+        log = getLogger('F3DZEX.loadOtherSegments')
+        fpath, fext = os.path.splitext(filepath)
+        fpath, fname = os.path.split(fpath)
+        # for segment 2, use [room file prefix]_scene then [same].zscene then segment_02.zdata then fallback to any .zscene
+        scene_file = None
+        if "_room" in fname:
+            scene_file = fpath + "/" + fname[:fname.index("_room")] + "_scene"
+            if not os.path.isfile(scene_file):
+                scene_file += ".zscene"
+        if not scene_file or not os.path.isfile(scene_file):
+            scene_file = fpath + "/segment_02.zdata"
+        if not scene_file or not os.path.isfile(scene_file):
+            scene_file = None
+            for f in os.listdir(fpath):
+                if f.endswith('.zscene'):
+                    if scene_file:
+                        log.warning('Found another .zscene file %s, keeping %s' % (f, scene_file))
+                    else:
+                        scene_file = fpath + '/' + f
+        if scene_file and os.path.isfile(scene_file):
+            log.info('Loading scene segment 0x02 from %s' % scene_file)
+            self.loadSegment(2, scene_file)
+        else:
+            log.debug('No file found to load scene segment 0x02 from')
+        for i in range(16):
+            if i == 2:
+                continue
+            # I was told this is "ZRE" naming?
+            segment_data_file = fpath + "/segment_%02X.zdata" % i
+            if os.path.isfile(segment_data_file):
+                log.info('Loading segment 0x%02X from %s' % (i, segment_data_file))
+                self.loadSegment(i, segment_data_file)
+            else:
+                log.debug('No file found to load segment 0x%02X from', i)
+
+    def locateHierarchies(self):
+        log = getLogger('F3DZEX.locateHierarchies')
+        data = self.segment[0x06]
+        for i in range(0, len(data)-11, 4):
+            # test for header "bboooooo pp000000 xx000000": if segment bb=0x06 and offset oooooo 4-aligned and not zero parts (pp!=0)
+            if data[i] == 0x06 and (data[i+3] & 3) == 0 and data[i+4] != 0:
+                offset = unpack_from(">L", data, i)[0] & 0x00FFFFFF
+                if offset < len(data):
+                    # each Limb index entry is 4 bytes starting at offset
+                    offset_end = offset + (data[i+4] << 2)
+                    if offset_end <= len(data):
+                        j = offset
+                        while j < offset_end:
+                            # test for limb entry "bboooooo": valid limb entry table as long as segment bb=0x06 and offset oooooo 4-aligned and offset is valid
+                            if data[j] != 0x06 or (data[j+3] & 3) != 0 or (unpack_from(">L", data, j)[0] & 0x00FFFFFF) > len(data):
+                                break
+                            j += 4
+                        if (j == i):
+                            j |= 0x06000000
+                            log.info("    hierarchy found at 0x%08X", j)
+                            h = Hierarchy()
+                            if h.read(self.segment, j, prefix=self.prefix):
+                                self.hierarchy.append(h)
+                            else:
+                                log.warning('Skipping hierarchy at 0x%08X', j)
+
+    def locateAnimations(self, limbCount):
+        log = getLogger('F3DZEX.locateAnimations')
+        self.animation = []
+        self.offsetAnims = []
+        self.durationAnims = []
+        for i, frames in findAnimationHeaders(self.segment[0x06], limbCount):
+            log.info("          Anims found at %08X Frames: %d", i, frames)
+            self.animation.append(i)
+            self.offsetAnims.append((0x06 << 24) | i)
+            self.durationAnims.append(frames)
+            self.animTotal += 1
+        if(self.animTotal > 0):
+                log.info("          Total Anims                         : %d", self.animTotal)
+
+    def locateExternAnimations(self, limbCount):
+        log = getLogger('F3DZEX.locateExternAnimations')
+        self.animation = []
+        self.offsetAnims = []
+        self.durationAnims = []
+        for i, frames in findAnimationHeaders(self.segment[0x0F], limbCount):
+            log.info("          Ext Anims found at %08X Frames: %d", i, frames)
+            self.animation.append(i)
+            self.offsetAnims.append((0x0F << 24) | i)
+            self.durationAnims.append(frames)
+            self.animTotal += 1
+        if(self.animTotal > 0):
+            log.info("        Total Anims                   : %d", self.animTotal)
+
+    def locateLinkAnimations(self):
+        log = getLogger('F3DZEX.locateLinkAnimations')
+        data = self.segment[0x04]
+        self.animation = []
+        self.offsetAnims = []
+        self.animFrames = []
+        self.animTotal = -1
+        if (len( self.segment[0x04] ) > 0):
+            if (MajorasAnims):
+                for i in range(0xD000, 0xE4F8, 8):
+                    self.animTotal += 1
+                    self.animation.append(self.animTotal)
+                    self.animFrames.append(self.animTotal)
+                    self.offsetAnims.append(self.animTotal)
+                    self.offsetAnims[self.animTotal]     = unpack_from(">L", data, i + 4)[0]
+                    self.animFrames[self.animTotal] = unpack_from(">h", data, i)[0]
+                    log.debug('- Animation #%d offset: %07X frames: %d', self.animTotal+1, self.offsetAnims[self.animTotal], self.animFrames[self.animTotal])
+            else:
+                for i in range(0x2310, 0x34F8, 8):
+                    self.animTotal += 1
+                    self.animation.append(self.animTotal)
+                    self.animFrames.append(self.animTotal)
+                    self.offsetAnims.append(self.animTotal)
+                    self.offsetAnims[self.animTotal]     = unpack_from(">L", data, i + 4)[0]
+                    self.animFrames[self.animTotal] = unpack_from(">h", data, i)[0]
+                    log.debug('- Animation #%d offset: %07X frames: %d', self.animTotal+1, self.offsetAnims[self.animTotal], self.animFrames[self.animTotal])
+        log.info("         Link has come to town!!!!")
+        # built from the segments by the addon, see SceneBuilder.buildLinkAnimations
+        self.useLinkAnimations = (len( self.segment[0x07] ) > 0) and (self.animTotal > 0)
+
+    def importJFIF(self, data, initPropsOffset, name_format='bg_%08X', index=0):
+        log = getLogger('F3DZEX.importJFIF')
+        (   imagePtr,
+            unknown, unknown2,
+            background_width, background_height,
+            imageFmt, imageSiz, imagePal, imageFlip
+        ) = struct.unpack_from('>IIiHHBBHH', data, initPropsOffset)
+        t = Tile()
+        t.texFmt = imageFmt
+        t.texSiz = imageSiz
+        log.debug(
+            'JFIF background image init properties\n'
+            'imagePtr=0x%X size=%dx%d fmt=%d, siz=%d (%s) imagePal=%d imageFlip=%d',
+            imagePtr, background_width, background_height,
+            imageFmt, imageSiz, t.getFormatName(), imagePal, imageFlip
+        )
+        if imagePtr >> 24 != 0x03:
+            log.error('Skipping JFIF background image, pointer 0x%08X is not in segment 0x03', imagePtr)
+            return False
+        jfifDataStart = imagePtr & 0xFFFFFF
+        # read header just for sanity checks
+        # source: CloudModding wiki https://wiki.cloudmodding.com/oot/JFIF_Backgrounds
+        (   marker_begin,
+            marker_begin_header, header_length,
+            jfif, null, version,
+            dens, densx, densy,
+            thumbnail_width, thumbnail_height,
+            marker_end_header
+        ) = struct.unpack_from('>HHHIBHBHHBBH', data, jfifDataStart)
+        badJfif = []
+        if marker_begin != 0xFFD8:
+            badJfif.append('Expected marker_begin=0xFFD8 instead of 0x%04X' % marker_begin)
+        if marker_begin_header != 0xFFE0:
+            badJfif.append('Expected marker_begin_header=0xFFE0 instead of 0x%04X' % marker_begin_header)
+        if header_length != 16:
+            badJfif.append('Expected header_length=16 instead of %d=0x%04X' % (header_length, header_length))
+        if jfif != 0x4A464946: # JFIF
+            badJfif.append('Expected jfif=0x4A464946="JFIF" instead of 0x%08X' % jfif)
+        if null != 0:
+            badJfif.append('Expected null=0 instead of 0x%02X' % null)
+        if version != 0x0101:
+            badJfif.append('Expected version=0x0101 instead of 0x%04X' % version)
+        if dens != 0:
+            badJfif.append('Expected dens=0 instead of %d=0x%02X' % (dens, dens))
+        if densx != 1:
+            badJfif.append('Expected densx=1 instead of %d=0x%04X' % (densx, densx))
+        if densy != 1:
+            badJfif.append('Expected densy=1 instead of %d=0x%04X' % (densy, densy))
+        if thumbnail_width != 0:
+            badJfif.append('Expected thumbnail_width=0 instead of %d=0x%02X' % (thumbnail_width, thumbnail_width))
+        if thumbnail_height != 0:
+            badJfif.append('Expected thumbnail_height=0 instead of %d=0x%02X' % (thumbnail_height, thumbnail_height))
+        if marker_end_header != 0xFFDB:
+            badJfif.append('Expected marker_end_header=0xFFDB instead of 0x%04X' % marker_end_header)
+        if badJfif:
+            log.error('Bad JFIF format for background image at 0x%X:', jfifDataStart)
+            for badJfifMessage in badJfif:
+                log.error(badJfifMessage)
+            return False
+        jfifData = None
+        i = jfifDataStart
+        for i in range(jfifDataStart, len(data)-1):
+            if data[i] == 0xFF and data[i+1] == 0xD9:
+                jfifData = data[jfifDataStart:i+2]
+                break
+        if jfifData is None:
+            log.error('Did not find end marker 0xFFD9 in background image at 0x%X', jfifDataStart)
+            return False
+        background = Background(
+            self.prefix + (name_format % jfifDataStart), 'jfif_%s.jfif' % (name_format % jfifDataStart),
+            jfifData, background_width, background_height, index)
+        self.backgrounds.append(background)
+        return background
+
+    def importMap(self):
+        if importStrategy == 'NO_DETECTION':
+            self.importMapWithHeaders()
+        elif importStrategy == 'BRUTEFORCE':
+            self.searchAndImport(3, False)
+        elif importStrategy == 'SMART':
+            self.importMapWithHeaders()
+            self.searchAndImport(3, True)
+        elif importStrategy == 'TRY_EVERYTHING':
+            self.importMapWithHeaders()
+            self.searchAndImport(3, False)
+
+    def importMapWithHeaders(self):
+        log = getLogger('F3DZEX.importMapWithHeaders')
+        data = self.segment[0x03]
+        for i in range(0, len(data), 8):
+            if data[i] == 0x0A:
+                mapHeaderSegment = data[i+4]
+                if mapHeaderSegment != 0x03:
+                    log.warning('Skipping map header located in segment 0x%02X, referenced by command at 0x%X', mapHeaderSegment, i)
+                    continue
+                # mesh header offset 
+                mho = (data[i+5] << 16) | (data[i+6] << 8) | data[i+7]
+                if not mho < len(data):
+                    log.error('Mesh header offset 0x%X is past the room file size, skipping', mho)
+                    continue
+                type = data[mho]
+                log.info("            Mesh Type: %d" % type)
+                if type == 0:
+                    if mho + 12 > len(data):
+                        log.error('Mesh header at 0x%X of type %d extends past the room file size, skipping', mho, type)
+                        continue
+                    count = data[mho+1]
+                    startSeg = data[mho+4]
+                    start = (data[mho+5] << 16) | (data[mho+6] << 8) | data[mho+7]
+                    endSeg = data[mho+8]
+                    end = (data[mho+9] << 16) | (data[mho+10] << 8) | data[mho+11]
+                    if startSeg != endSeg:
+                        log.error('Mesh header at 0x%X of type %d has start and end in different segments 0x%02X and 0x%02X, skipping', mho, type, startSeg, endSeg)
+                        continue
+                    if startSeg != 0x03:
+                        log.error('Skipping mesh header at 0x%X of type %d: entries are in segment 0x%02X', mho, type, startSeg)
+                        continue
+                    log.info('Reading %d display lists from 0x%X to 0x%X', count, start, end)
+                    for j in range(start, end, 8):
+                        opa = unpack_from(">L", data, j)[0]
+                        if opa:
+                            self.use_transparency = False
+                            self.buildDisplayList(None, [None], opa, mesh_name_format='%s_opa')
+                        xlu = unpack_from(">L", data, j+4)[0]
+                        if xlu:
+                            self.use_transparency = True
+                            self.buildDisplayList(None, [None], xlu, mesh_name_format='%s_xlu')
+                elif type == 1:
+                    format = data[mho+1]
+                    entrySeg = data[mho+4]
+                    entry = (data[mho+5] << 16) | (data[mho+6] << 8) | data[mho+7]
+                    if entrySeg == 0x03:
+                        opa = unpack_from(">L", data, entry)[0]
+                        if opa:
+                            self.use_transparency = False
+                            self.buildDisplayList(None, [None], opa, mesh_name_format='%s_opa')
+                        xlu = unpack_from(">L", data, entry+4)[0]
+                        if xlu:
+                            self.use_transparency = True
+                            self.buildDisplayList(None, [None], xlu, mesh_name_format='%s_xlu')
+                    else:
+                        log.error('Skipping mesh header at 0x%X of type %d: entry is in segment 0x%02X', mho, type, entrySeg)
+                    if format == 1:
+                        if not self.importJFIF(data, mho + 8):
+                            log.error('Failed to import jfif background image, mesh header at 0x%X of type 1 format 1', mho)
+                    elif format == 2:
+                        background_count = data[mho + 8]
+                        backgrounds_array = unpack_from(">L", data, mho + 0xC)[0]
+                        if backgrounds_array >> 24 == 0x03:
+                            backgrounds_array &= 0xFFFFFF
+                            for i in range(background_count):
+                                bg_record_offset = backgrounds_array + i * 0x1C
+                                unk82, bgid = struct.unpack_from('>HB', data, bg_record_offset)
+                                if unk82 != 0x0082:
+                                    log.error('Skipping JFIF: mesh header at 0x%X type 1 format 2 background record entry #%d at 0x%X expected unk82=0x0082, not 0x%04X', mho, i, bg_record_offset, unk82)
+                                    continue
+                                background = self.importJFIF(
+                                    data, bg_record_offset + 4,
+                                    name_format='bg_%d_%s' % (i, '%08X'), index=i
+                                )
+                                if not background:
+                                    log.error('Failed to import jfif background image from record entry #%d at 0x%X, mesh header at 0x%X of type 1 format 2', i, bg_record_offset, mho)
+                        else:
+                            log.error('Skipping mesh header at 0x%X of type 1 format 2: backgrounds_array=0x%08X is not in segment 0x03', mho, backgrounds_array)
+                    else:
+                        log.error('Unknown format %d for mesh type 1 in mesh header at 0x%X', format, mho)
+                elif type == 2:
+                    if mho + 12 > len(data):
+                        log.error('Mesh header at 0x%X of type %d extends past the room file size, skipping', mho, type)
+                        continue
+                    count = data[mho+1]
+                    startSeg = data[mho+4]
+                    start = (data[mho+5] << 16) | (data[mho+6] << 8) | data[mho+7]
+                    endSeg = data[mho+8]
+                    end = (data[mho+9] << 16) | (data[mho+10] << 8) | data[mho+11]
+                    if startSeg != endSeg:
+                        log.error('Mesh header at 0x%X of type %d has start and end in different segments 0x%02X and 0x%02X, skipping', mho, type, startSeg, endSeg)
+                        continue
+                    if startSeg != 0x03:
+                        log.error('Skipping mesh header at 0x%X of type %d: entries are in segment 0x%02X', mho, type, startSeg)
+                        continue
+                    log.info('Reading %d display lists from 0x%X to 0x%X', count, start, end)
+                    for j in range(start, end, 16):
+                        opa = unpack_from(">L", data, j+8)[0]
+                        if opa:
+                            self.use_transparency = False
+                            self.buildDisplayList(None, [None], opa, mesh_name_format='%s_opa')
+                        xlu = unpack_from(">L", data, j+12)[0]
+                        if xlu:
+                            self.use_transparency = True
+                            self.buildDisplayList(None, [None], xlu, mesh_name_format='%s_xlu')
+                else:
+                    log.error('Unknown mesh type %d in mesh header at 0x%X', type, mho)
+            elif (data[i] == 0x14):
+                return
+        log.warning('Map headers ended unexpectedly')
+
+    def importObj(self):
+        log = getLogger('F3DZEX.importObj')
+        log.info("Locating hierarchies...")
+        self.locateHierarchies()
+
+        if len(self.displaylists) != 0:
+            log.info('Importing display lists defined in displaylists.txt')
+            for offsetStr in self.displaylists:
+                while offsetStr and offsetStr[-1] in ('\r','\n'):
+                    offsetStr = offsetStr[:-1]
+                if re.match(r'^[0-9]+$', offsetStr):
+                    log.warning('Reading offset %s as hexadecimal, NOT decimal', offsetStr)
+                if len(offsetStr) > 2 and offsetStr[:2] == '0x':
+                    offsetStr = offsetStr[2:]
+                try:
+                    offset = int(offsetStr, 16)
+                except ValueError:
+                    log.error('Could not parse %s from displaylists.txt as hexadecimal, skipping entry', offsetStr)
+                    continue
+                if (offset & 0xFF000000) == 0:
+                    log.info('Defaulting segment for offset 0x%X to 6', offset)
+                    offset |= 0x06000000
+                log.info('Importing display list 0x%08X (from displaylists.txt)', offset)
+                self.buildDisplayList(None, 0, offset)
+
+        for hierarchy in self.hierarchy:
+            log.info("Building hierarchy '%s'..." % hierarchy.name)
+            for i in range(hierarchy.limbCount):
+                limb = hierarchy.limb[i]
+                if limb.near != 0:
+                    if validOffset(self.segment, limb.near):
+                        log.info("    0x%02X : building display lists..." % i)
+                        self.resetCombiner()
+                        self.buildDisplayList(hierarchy, limb, limb.near)
+                    else:
+                        log.info("    0x%02X : out of range" % i)
+                else:
+                    log.info("    0x%02X : n/a" % i)
+        if len(self.hierarchy) > 0:
+            if loadAnimations:
+                # use the hierarchy with most bones
+                # this works for building any animation regardless of its target skeleton (bone positions) because all limbs are named limb_XX, so the hierarchy with most bones has bones with same names as every other armature
+                # and the rotation and root location animated values don't rely on the actual armature used
+                # and in blender each action can be used for any armature, vertex groups/bone names just have to match
+                # this is useful for iron knuckles and anything with several hierarchies, although an unedited iron kunckles zobj won't work
+                hierarchy = max(self.hierarchy, key=lambda h:h.limbCount)
+                if(ExternalAnimes and len(self.segment[0x0F]) > 0):
+                    self.locateExternAnimations(hierarchy.limbCount)
+                else:
+                    self.locateAnimations(hierarchy.limbCount)
+                if len(self.animation) > 0:
+                    log.info('Reading animations for hierarchy %s', hierarchy.name)
+                    for i in range(len(self.animation)):
+                        log.info("   Loading animation %d/%d 0x%08X", i + 1, len(self.animation), self.offsetAnims[i])
+                        animation = Animation(self.offsetAnims[i], self.durationAnims[i])
+                        if animation.read(self.segment, hierarchy.limbCount):
+                            self.animations.append(animation)
+                else:
+                    self.locateLinkAnimations()
+            else:
+                log.info("    Load anims OFF.")
+
+        if importStrategy == 'NO_DETECTION':
+            pass
+        elif importStrategy == 'BRUTEFORCE':
+            self.searchAndImport(6, False)
+        elif importStrategy == 'SMART':
+            self.searchAndImport(6, True)
+        elif importStrategy == 'TRY_EVERYTHING':
+            self.searchAndImport(6, False)
+
+    def searchAndImport(self, segment, skipAlreadyRead):
+        log = getLogger('F3DZEX.searchAndImport')
+        data = self.segment[segment]
+        self.use_transparency = detectedDisplayLists_use_transparency
+        log.info(
+            'Searching for %s display lists in segment 0x%02X (materials with transparency: %s)',
+            'non-read' if skipAlreadyRead else 'any', segment, 'yes' if self.use_transparency else 'no')
+        log.warning('If the imported geometry is weird/wrong, consider using displaylists.txt to manually define the display lists to import!')
+        bytes_ = numpy.frombuffer(bytes(data), dtype=numpy.uint8)
+        opcodes = bytes_[0::8]
+        # valid commands are 0x00-0x07 and 0xD3-0xFF
+        # however, could be not considered valid:
+        # 0x07 G_QUAD
+        # 0xEC G_SETCONVERT (YUV-related)
+        # 0xE4 G_TEXRECT, 0xF6 G_FILLRECT (2d overlay)
+        # 0xEB, 0xEE, 0xEF, 0xF1 ("unimplemented -> rarely used" being the reasoning)
+        # but filtering out those hurts the resulting import
+        isValid = (opcodes <= 0x07) | (opcodes >= 0xD3) #and opcode not in (0x07,0xEC,0xE4,0xF6,0xEB,0xEE,0xEF,0xF1)
+        validOpcodesSkipped = set()
+        if detectedDisplayLists_consider_unimplemented_invalid:
+            unimplemented = isValid & numpy.in1d(opcodes, (0x07,0xE5,0xEC,0xD3,0xDB,0xDC,0xDD,0xE0,0xE9,0xF6,0xF8))
+            validOpcodesSkipped.update(numpy.unique(opcodes[unimplemented]).tolist())
+            isValid &= ~unimplemented
+        # commands meaning "end of dlist"
+        second = numpy.zeros(len(opcodes), dtype=numpy.uint8)
+        second[:len(bytes_[1::8])] = bytes_[1::8]
+        ends = numpy.flatnonzero(((opcodes == 0xDE) & (second != 0)) | (opcodes == 0xDF))
+        # a display list ending at a command starts at the earliest valid command
+        # following both the last invalid command and the previous end
+        indices = numpy.arange(len(opcodes))
+        afterInvalid = numpy.maximum.accumulate(numpy.where(isValid, 0, indices + 1))
+        afterPreviousEnd = numpy.concatenate(([0], ends[:-1] + 1))
+        starts = numpy.maximum(afterInvalid[ends], afterPreviousEnd) if len(ends) else ends
+        for start, end in zip((starts * 8).tolist(), (ends * 8).tolist()):
+            log.debug('Found opcode 0x%X at 0x%X, building display list from 0x%X', data[end], end, start)
+            self.buildDisplayList(
+                None, [None], (segment << 24) | start,
+                mesh_name_format = '%s_detect',
+                skipAlreadyRead = skipAlreadyRead,
+                extraLenient = True
+            )
+        if validOpcodesSkipped:
+            log.info('Valid opcodes %s considered invalid because unimplemented (meaning rare)', ','.join('0x%02X' % opcode for opcode in sorted(validOpcodesSkipped)))
+
+    def resetCombiner(self):
+        self.primColor = (1.0, 1.0, 1.0, 1.0)
+        self.envColor = (1.0, 1.0, 1.0, 1.0)
+        self.updateCombiner()
+
+    def setGeometryMode(self, geometryMode):
+        """
+        Set the geometry mode bitmask (see geometryModeMasks) and update the decisions depending on it
+        The combiner also depends on it, see updateCombiner
+        """
+        self.geometryMode = geometryMode
+        self.useSmooth = (geometryMode & (G_SHADE | G_SHADING_SMOOTH)) == (G_SHADE | G_SHADING_SMOOTH)
+        self.useNormals = vertexMode == 'NORMALS' or (vertexMode == 'AUTO' and (geometryMode & G_LIGHTING) != 0)
+        # todo assume G_LIGHTING means normals if set, and colors if clear, but G_SHADE may play a role too?
+        self.useColors = vertexMode == 'COLORS' or (vertexMode == 'AUTO' and (geometryMode & G_LIGHTING) == 0)
+
+    def checkUseNormals(self):
+        return self.useNormals
+
+    def updateCombiner(self):
+        """
+        Precompute the per-vertex independent part of the combiner color, call whenever the colors or geometry mode change
+        combinerColor is the product of the enabled prim/env colors, combinerSource what it is multiplied by for each vertex:
+        'COLORS' (vertex color), 'NORMALS' (shade computed from the vertex normal) or None
+        """
+        cc = (1.0, 1.0, 1.0, 1.0)
+        # todo these have an effect even if vertexMode == 'NONE' ?
+        if enablePrimColor:
+            cc = tuple(c * p for c, p in zip(cc, self.primColor))
+        if enableEnvColor:
+            cc = tuple(c * e for c, e in zip(cc, self.envColor))
+        if self.useColors:
+            self.combinerSource = 'COLORS'
+        elif self.useNormals:
+            self.combinerSource = 'NORMALS'
+        else:
+            self.combinerSource = None
+        self.combinerColor = numpy.array(cc if checkUseVertexAlpha() else cc[:3], dtype=numpy.float64)
+        # combiner colors of the vertices in vbuf, computed when needed by addTri
+        self.vbufColors = None
+
+    def getCombinerColors(self, verts):
+        """
+        Combiner color of each vertex in verts (vertexBufferDtype), computed all at once
+        """
+        colorSize = len(self.combinerColor)
+        if self.combinerSource == 'COLORS':
+            return verts['color'][:, :colorSize] * self.combinerColor
+        colors = numpy.tile(self.combinerColor, (len(verts), 1))
+        if self.combinerSource == 'NORMALS':
+            # todo is this computation of shadeColor correct?
+            normal = verts['normal'].astype(numpy.float64)
+            sc = (((normal[:, 0] + normal[:, 1] + normal[:, 2]) / 3) + 1.0) / 2
+            colors[:, :3] *= sc[:, numpy.newaxis]
+        return colors
+
+    def getState(self):
+        """
+        The state display lists read and change, besides the mesh they build
+        """
+        return (
+            tuple(tile.getState() for tile in self.tile), self.curTile, self.palSize,
+            self.geometryMode, tuple(self.primColor), tuple(self.envColor),
+            self.vbuf.tobytes()
+        )
+
+    def setState(self, state):
+        tiles, self.curTile, self.palSize, geometryMode, primColor, envColor, vbuf = state
+        for tile, tileState in zip(self.tile, tiles):
+            tile.setState(tileState)
+        self.primColor, self.envColor = primColor, envColor
+        self.vbuf[:] = numpy.frombuffer(vbuf, dtype=vertexBufferDtype)
+        self.setGeometryMode(geometryMode)
+        self.updateCombiner()
+
+    def callDisplayList(self, ctx, offset):
+        """
+        Build the display list called at offset, or if it was already built from the same state,
+        make objects from the meshes it created and restore the state it left instead of reading it again
+        """
+        if len(self.callStack) >= displayListMaxDepth:
+            ctx.log.warning('Not calling display list 0x%08X from 0x%08X, calls are nested more than %d deep', offset, ctx.offset, displayListMaxDepth)
+            return
+        if any(frame.offset == offset for frame in self.callStack):
+            ctx.log.warning('Not calling display list 0x%08X from 0x%08X, it is already being read (cycle)', offset, ctx.offset)
+            return
+        key = None
+        if not ctx.skipAlreadyRead:
+            # (calling it again would skip it anyway)
+            key = (
+                offset, ctx.hierarchy, ctx.limb if ctx.hierarchy else None,
+                ctx.mesh_name_format, self.use_transparency, self.getState()
+            )
+            effects = self.subroutineEffects.get(key)
+            if effects:
+                meshes, state = effects
+                ctx.log.trace('Reusing display list 0x%08X', offset)
+                self.objects.extend(meshes)
+                self.createdMeshes.extend(meshes)
+                self.setState(state)
+                return
+        callee = self.beginDisplayList(ctx.hierarchy, ctx.limb, offset, ctx.mesh_name_format, ctx.skipAlreadyRead, False)
+        if callee:
+            callee.memoKey = key
+            callee.firstMesh = len(self.createdMeshes)
+            self.callStack.append(callee)
+
+    def getCommands(self, segment, phase):
+        """
+        (w0, w1) words of the 8-byte commands in a segment starting at offset phase (0-7),
+        decoded once per segment data instead of once per command read
+        """
+        data = self.segment[segment]
+        cached = self.commands.get((segment, phase))
+        if cached and cached[0] is data:
+            return cached[1]
+        count = max(0, (len(data) - phase) >> 3)
+        if count:
+            commands = numpy.frombuffer(data, dtype='>u4', count=count * 2, offset=phase).reshape(count, 2).tolist()
+        else:
+            commands = []
+        self.commands[(segment, phase)] = (data, commands)
+        return commands
+
+    def beginDisplayList(self, hierarchy, limb, offset, mesh_name_format, skipAlreadyRead, extraLenient):
+        """
+        Context to read the display list at offset from, or None if it was read already and skipAlreadyRead
+        """
+        log = getLogger('F3DZEX.buildDisplayList')
+        segment = offset >> 24
+        segmentMask = segment << 24
+        data = self.segment[segment]
+
+        startOffset = offset & 0x00FFFFFF
+        endOffset = len(data)
+        if skipAlreadyRead:
+            log.trace('is 0x%X in %r ?', startOffset, self.alreadyRead[segment])
+            if self.alreadyRead[segment].contains(startOffset):
+                log.debug('Skipping already read dlist at 0x%X', startOffset)
+                return
+            fromOffset = self.alreadyRead[segment].nextStart(startOffset)
+            if fromOffset is not None and endOffset > fromOffset:
+                endOffset = fromOffset
+                log.debug('Shortening dlist to end at most at 0x%X, at which point it was read already', endOffset)
+            log.trace('no it is not')
+
+        log.debug('Reading dlists from 0x%08X', segmentMask | startOffset)
+        commands = self.getCommands(segment, startOffset & 7)
+        return DisplayListContext(hierarchy, limb, offset, data, commands, endOffset, mesh_name_format, skipAlreadyRead, extraLenient, log)
+
+    def buildDisplayList(self, hierarchy, limb, offset, mesh_name_format='%s', skipAlreadyRead=False, extraLenient=False):
+        """
+        Read the display list at offset and the ones it calls, using an explicit call stack
+        (see callDisplayList) instead of recursion, reading at most displayListMaxCommands commands
+        """
+        ctx = self.beginDisplayList(hierarchy, limb, offset, mesh_name_format, skipAlreadyRead, extraLenient)
+        if not ctx:
+            return
+        handlers = self.opcodeHandlers
+        stack = self.callStack = [ctx]
+        self.createdMeshes = []
+        count = 0
+        try:
+            while stack:
+                ctx = stack[-1]
+                if ctx.end is None and ctx.index < ctx.indexEnd:
+                    if displayListMaxCommands and count >= displayListMaxCommands:
+                        ctx.log.error('Read %d commands from display list 0x%08X, stopping', count, offset)
+                        for frame in stack:
+                            frame.stop()
+                        continue
+                    k = ctx.index
+                    ctx.index = k + 1
+                    count += 1
+                    w0, w1 = ctx.commands[k]
+                    i = ctx.phase | (k << 3)
+                    # handlers return True when the display list ends
+                    if handlers[w0 >> 24](ctx, i, w0, w1):
+                        ctx.end = i
+                    continue
+                if ctx.end is None:
+                    ctx.log.warning('Reached end of dlist started at 0x%X', ctx.startOffset)
+                    ctx.end = ctx.endOffset
+                stack.pop()
+                self.endDisplayList(ctx, ctx.end)
+                if ctx.memoKey is not None:
+                    self.subroutineEffects[ctx.memoKey] = (self.createdMeshes[ctx.firstMesh:], self.getState())
+        finally:
+            self.callStack = []
+            self.createdMeshes = None
+
+    def endDisplayList(self, ctx, i):
+        if ctx.mesh.finish(ctx.mesh_name_format, ctx.hierarchy, ctx.offset, self.checkUseNormals(), prefix=self.prefix):
+            self.objects.append(ctx.mesh)
+            self.createdMeshes.append(ctx.mesh)
+        self.alreadyRead[ctx.segment].add(ctx.startOffset, i)
+
+    def opUnimplemented(self, ctx, i, w0, w1):
+        ctx.log.warning('Skipped (unimplemented) opcode 0x%02X' % (w0 >> 24))
+
+    def opNoop(self, ctx, i, w0, w1):
+        pass
+
+    def getVertexBlock(self, vaddr, count):
+        """
+        count vertices at segmented offset vaddr decoded to vertexBufferDtype,
+        cached as the same vertices are usually loaded by several display lists
+        """
+        seg, offset = splitOffset(vaddr)
+        data = self.segment[seg]
+        cached = self.vertexBlocks.get((vaddr, count))
+        if cached and cached[0] is data:
+            return cached[1]
+        raw = numpy.frombuffer(data, dtype=vertexDtype, count=count, offset=offset)
+        block = numpy.empty(count, dtype=vertexBufferDtype)
+        pos = raw['pos'].astype(numpy.float32)
+        block['pos'] = numpy.stack((pos[:,0], -pos[:,2], pos[:,1]), axis=1)
+        block['pos'] *= scaleFactor
+        block['uv'] = raw['uv']
+        normal = raw['normalColor'].view(numpy.int8).astype(numpy.float32)
+        block['normal'] = numpy.stack((normal[:,0], -normal[:,2], normal[:,1]), axis=1) / 128
+        block['color'] = raw['normalColor'] / 255
+        block['limb'] = -1
+        self.vertexBlocks[(vaddr, count)] = (data, block)
+        return block
+
+    # G_VTX
+    def opVtx(self, ctx, i, w0, w1):
+        count = (w0 >> 12) & 0xFF
+        index = ((w0 & 0xFF) >> 1) - count
+        vaddr = w1
+        if validOffset(self.segment, vaddr + int(16 * count) - 1):
+            slots = numpy.arange(index, index + count)
+            self.vbuf[slots] = self.getVertexBlock(vaddr, count)
+            if ctx.hierarchy:
+                limb = ctx.matrix[len(ctx.matrix) - 1]
+                if limb:
+                    self.vbuf['limb'][slots] = limb.index
+                    self.vbuf['pos'][slots] += limb.pos
+            self.vbufColors = None
+
+    # G_MODIFYVTX
+    def opModifyVtx(self, ctx, i, w0, w1):
+        data = ctx.data
+        try:
+            index = ((data[i + 2] & 0x0F) << 3) | (data[i + 3] >> 1)
+            vertex = self.vbuf[index]
+            if data[i + 1] == 0x10:
+                normal = unpack_from("bbb", data, i + 4)
+                vertex['normal'] = (normal[0] / 128, -normal[2] / 128, normal[1] / 128)
+                vertex['color'] = [c / 255 for c in unpack_from("BBBB", data, i + 4)]
+            elif data[i + 1] == 0x14:
+                vertex['uv'] = unpack_from(">hh", data, i + 4)
+            self.vbufColors = None
+        except IndexError:
+            if not ctx.extraLenient:
+                ctx.log.exception('Bad vertex indices in 0x02 at 0x%X %08X %08X', i, w0, w1)
+
+    # G_TRI1, G_TRI2
+    def opTri(self, ctx, i, w0, w1):
+        log = ctx.log
+        mesh = ctx.mesh
+        if ctx.has_tex:
+            materialKey = self.tile[0].getMaterialKey(self.use_transparency, self.prefix)
+            ctx.material = self.material.get(materialKey)
+            if ctx.material is None:
+                ctx.material = self.tile[0].getMaterial(self.segment, self.use_transparency, prefix=self.prefix, textureDecodings=self.textureDecodings)
+                if ctx.material:
+                    self.material[materialKey] = ctx.material
+                    self.materials.append(ctx.material)
+            ctx.has_tex = False
+        if not importTextures:
+            ctx.material = None
+        size = mesh.getSize()
+        try:
+            # a1 a2 a3 are microcode values
+            revert = not self.addTri(ctx, (w0 >> 16) & 0xFF, (w0 >> 8) & 0xFF, w0 & 0xFF)
+            if w0 >> 24 == 0x06:
+                revert = revert or not self.addTri(ctx, (w1 >> 16) & 0xFF, (w1 >> 8) & 0xFF, w1 & 0xFF)
+        except:
+            log.exception('Failed to import vertices and/or their data from 0x%X', i)
+            revert = True
+        if revert:
+            # revert any change
+            mesh.truncate(size)
+
+    def addTri(self, ctx, a1, a2, a3):
+        mesh = ctx.mesh
+        slots = [a >> 1 for a in (a1,a2,a3)]
+        try:
+            verts = self.vbuf[slots]
+        except IndexError:
+            if ctx.extraLenient:
+                return False
+            raise
+        if self.vbufColors is None:
+            self.vbufColors = self.getCombinerColors(self.vbuf)
+        verts_pos = [tuple(pos) for pos in verts['pos'].tolist()]
+        verts_uv = verts['uv'].tolist()
+        verts_normal = verts['normal'].tolist()
+        verts_limb = verts['limb'].tolist()
+        verts_index = [mesh.vertsIndex.get(pos) for pos in verts_pos]
+        for j in range(3):
+            if verts_index[j] is None:
+                verts_index[j] = len(mesh.verts) // 3
+                mesh.verts.extend(verts_pos[j])
+                mesh.vertsIndex.setdefault(verts_pos[j], verts_index[j])
+        mesh.colors.extend(self.vbufColors[slots].ravel().tolist())
+        for j in range(3):
+            normal, uv = verts_normal[j], verts_uv[j]
+            mesh.uvs.extend((self.tile[0].offset[0] + uv[0] * self.tile[0].ratio[0], self.tile[0].offset[1] - uv[1] * self.tile[0].ratio[1]))
+            mesh.normals.extend(normal)
+            mesh.loops_limb.append(verts_limb[j] if ctx.hierarchy else -1)
+        mesh.faces.extend(verts_index)
+        mesh.faces_use_smooth.append(self.useSmooth)
+        mesh.faces_material.append(mesh.getMaterialIndex(ctx.material))
+        if len(set(verts_index)) < 3 and not ctx.extraLenient:
+            ctx.log.warning('Found empty tri! %d %d %d' % tuple(verts_index))
+        return True
+
+    # G_TEXTURE
+    def opTexture(self, ctx, i, w0, w1):
+        ctx.log.debug('0xD7 G_TEXTURE used, but unimplemented')
+        # fixme ?
+#        for i in range(2):
+#            if ((w1 >> 16) & 0xFFFF) < 0xFFFF:
+#                self.tile[i].scale[0] = ((w1 >> 16) & 0xFFFF) * 0.0000152587891
+#            else:
+#                self.tile[i].scale[0] = 1.0
+#            if (w1 & 0xFFFF) < 0xFFFF:
+#                self.tile[i].scale[1] = (w1 & 0xFFFF) * 0.0000152587891
+#            else:
+#                self.tile[i].scale[1] = 1.0
+
+    # G_POPMTX
+    def opPopMtx(self, ctx, i, w0, w1):
+        if not enableMatrices:
+            return self.opUnimplemented(ctx, i, w0, w1)
+        if ctx.hierarchy and len(ctx.matrix) > 1:
+            ctx.matrix.pop()
+
+    # G_MTX
+    def opMtx(self, ctx, i, w0, w1):
+        if not enableMatrices:
+            return self.opUnimplemented(ctx, i, w0, w1)
+        data = ctx.data
+        hierarchy = ctx.hierarchy
+        matrix = ctx.matrix
+        ctx.log.debug('0xDA G_MTX used, but implementation may be faulty')
+        # fixme this looks super weird, not sure what it's doing either
+        if hierarchy and data[i + 4] == 0x0D:
+            if (data[i + 3] & 0x04) == 0:
+                matrixLimb = hierarchy.getMatrixLimb(unpack_from(">L", data, i + 4)[0])
+                if (data[i + 3] & 0x02) == 0:
+                    newMatrixLimb = Limb()
+                    newMatrixLimb.index = matrixLimb.index
+                    newMatrixLimb.pos = (matrixLimb.pos + matrix[len(matrix) - 1].pos) / 2
+                    matrixLimb = newMatrixLimb
+                if (data[i + 3] & 0x01) == 0:
+                    matrix.append(matrixLimb)
+                else:
+                    matrix[len(matrix) - 1] = matrixLimb
+            else:
+                matrix.append(matrix[len(matrix) - 1])
+        elif hierarchy:
+            ctx.log.error("unknown limb %08X %08X" % (w0, w1))
+
+    # G_DL
+    def opDl(self, ctx, i, w0, w1):
+        ctx.log.trace('G_DE at 0x%X %08X%08X', (ctx.segment << 24) | i, w0, w1)
+        #mesh.create(mesh_name_format, hierarchy, offset, self.checkUseNormals())
+        #mesh.__init__()
+        #offset = segmentMask | i
+        if validOffset(self.segment, w1):
+            self.callDisplayList(ctx, w1)
+        # G_DL_NOPUSH branches instead of calling, the caller display list ends there
+        return ctx.data[i + 1] != 0x00
+
+    # G_ENDDL
+    def opEndDl(self, ctx, i, w0, w1):
+        ctx.log.trace('G_ENDDL at 0x%X %08X%08X', (ctx.segment << 24) | i, w0, w1)
+        return True
+
+    # handle "LOD dlists"
+    def opLodDl(self, ctx, i, w0, w1):
+        # 4 bytes starting at data[i+8+4] is a distance to check for displaying this dlist
+        #mesh.create(mesh_name_format, hierarchy, offset, self.checkUseNormals())
+        #mesh.__init__()
+        #offset = segmentMask | i
+        if validOffset(self.segment, w1):
+            self.callDisplayList(ctx, w1)
+        else:
+            ctx.log.warning('Invalid 0xE1 offset 0x%04X, skipping', w1)
+
+    # G_LOADTLUT
+    def opLoadTlut(self, ctx, i, w0, w1):
+        self.palSize = ((w1 & 0x00FFF000) >> 13) + 1
+
+    # G_SETTILESIZE
+    def opSetTileSize(self, ctx, i, w0, w1):
+        self.tile[self.curTile].rect[0] = (w0 & 0x00FFF000) >> 14
+        self.tile[self.curTile].rect[1] = (w0 & 0x00000FFF) >> 2
+        self.tile[self.curTile].rect[2] = (w1 & 0x00FFF000) >> 14
+        self.tile[self.curTile].rect[3] = (w1 & 0x00000FFF) >> 2
+        self.tile[self.curTile].width = (self.tile[self.curTile].rect[2] - self.tile[self.curTile].rect[0]) + 1
+        self.tile[self.curTile].height = (self.tile[self.curTile].rect[3] - self.tile[self.curTile].rect[1]) + 1
+        self.tile[self.curTile].texBytes = int(self.tile[self.curTile].width * self.tile[self.curTile].height) << 1
+        if (self.tile[self.curTile].texBytes >> 16) == 0xFFFF:
+            self.tile[self.curTile].texBytes = self.tile[self.curTile].size << 16 >> 15
+        self.tile[self.curTile].calculateSize()
+
+    # G_LOADTILE, G_TEXRECT, G_SETZIMG, G_SETCIMG (2d "direct" drawing?)
+    def opLogged(self, ctx, i, w0, w1):
+        ctx.log.debug('0x%X %08X : %08X', w0 >> 24, w0, w1)
+
+    # G_SETTILE
+    def opSetTile(self, ctx, i, w0, w1):
+        self.tile[self.curTile].texFmt = (w0 >> 21) & 0b111
+        self.tile[self.curTile].texSiz = (w0 >> 19) & 0b11
+        self.tile[self.curTile].lineSize = (w0 >> 9) & 0x1FF
+        self.tile[self.curTile].clip[0] = (w1 >> 8) & 0x03
+        self.tile[self.curTile].clip[1] = (w1 >> 18) & 0x03
+        self.tile[self.curTile].mask[0] = (w1 >> 4) & 0x0F
+        self.tile[self.curTile].mask[1] = (w1 >> 14) & 0x0F
+        self.tile[self.curTile].tshift[0] = w1 & 0x0F
+        self.tile[self.curTile].tshift[1] = (w1 >> 10) & 0x0F
+
+    # G_SETPRIMCOLOR
+    def opSetPrimColor(self, ctx, i, w0, w1):
+        self.primColor = tuple(((w1 >> (8*(3-i))) & 0xFF) / 255 for i in range(4))
+        ctx.log.debug('new primColor -> %r', self.primColor)
+        if enablePrimColor and self.primColor[3] != 1 and not checkUseVertexAlpha():
+            ctx.log.warning('primColor %r has non-opaque alpha, merging it into vertex colors may produce unexpected results', self.primColor)
+        #self.primColor = Vector([min(((w1 >> 24) & 0xFF) / 255, 1.0), min(0.003922 * ((w1 >> 16) & 0xFF), 1.0), min(0.003922 * ((w1 >> 8) & 0xFF), 1.0), min(0.003922 * ((w1) & 0xFF), 1.0)])
+        self.updateCombiner()
+
+    # G_SETENVCOLOR
+    def opSetEnvColor(self, ctx, i, w0, w1):
+        self.envColor = tuple(((w1 >> (8*(3-i))) & 0xFF) / 255 for i in range(4))
+        ctx.log.debug('new envColor -> %r', self.envColor)
+        if enableEnvColor and self.envColor[3] != 1 and not checkUseVertexAlpha():
+            ctx.log.warning('envColor %r has non-opaque alpha, merging it into vertex colors may produce unexpected results', self.envColor)
+        #self.envColor = Vector([min(0.003922 * ((w1 >> 24) & 0xFF), 1.0), min(0.003922 * ((w1 >> 16) & 0xFF), 1.0), min(0.003922 * ((w1 >> 8) & 0xFF), 1.0)])
+        if invertEnvColor:
+            self.envColor = tuple(1 - c for c in self.envColor)
+        self.updateCombiner()
+
+    # G_SETTIMG
+    def opSetTImg(self, ctx, i, w0, w1):
+        data = ctx.data
+        try:
+            if data[i - 8] == 0xF2:
+                self.curTile = 1
+            else:
+                self.curTile = 0
+        except:
+            ctx.log.exception('Failed to switch texel? at 0x%X', i)
+            pass
+        try:
+            if data[i + 8] == 0xE8:
+                self.tile[0].palette = w1
+            else:
+                self.tile[self.curTile].data = w1
+        except:
+            ctx.log.exception('Failed to switch texel data? at 0x%X', i)
+            pass
+        ctx.has_tex = True
+
+    # G_GEOMETRYMODE
+    def opGeometryMode(self, ctx, i, w0, w1):
+        # todo do not push mesh if geometry mode doesnt actually change?
+        #mesh.create(mesh_name_format, hierarchy, offset, self.checkUseNormals())
+        #mesh.__init__()
+        #offset = segmentMask | i
+        # https://wiki.cloudmodding.com/oot/F3DZEX#RSP_Geometry_Mode
+        # todo SharpOcarina tags
+        clearbits = ~w0 & 0x00FFFFFF
+        setbits = w1
+        geometryMode = (self.geometryMode & ~(clearbits & geometryModeKnownMask)) | (setbits & geometryModeKnownMask)
+        if geometryMode != self.geometryMode:
+            self.setGeometryMode(geometryMode)
+            self.updateCombiner()
+        if ctx.log.isEnabledFor(logging.DEBUG):
+            ctx.log.debug('Geometry mode flags as of 0x%X: %r', i, getGeometryModeNames(self.geometryMode))
+        """
+        # many unknown flags. keeping this commented out for any further research
+        if clearbits & ~geometryModeKnownMask:
+            log.warning('Unknown geometry mode flag at 0x%X in clearbits %s', i, bin(clearbits & ~geometryModeKnownMask))
+        if setbits & ~geometryModeKnownMask:
+            log.warning('Unknown geometry mode flag at 0x%X in setbits %s', i, bin(setbits & ~geometryModeKnownMask))
+        """
+
+
+def parseFile(filepath, importType, options=None, prefix=""):
+    """
+    Read the object or room file at filepath (and the data files next to it) with the given options (see setOptions)
+    Returns the F3DZEX holding the intermediate representation
+    """
+    global fpath, scaleFactor
+    log = getLogger('parseFile')
+    setOptions(options)
+    fpath, fext = os.path.splitext(filepath)
+    fpath, fname = os.path.split(fpath)
+    if originalObjectScale == 0:
+        if importType == "ROOM":
+            scaleFactor = 1 # maps are actually stored 1:1
+        else:
+            scaleFactor = 1 / 100 # most objects are stored 100:1
+    else:
+        scaleFactor = 1 / originalObjectScale
+
+    f3dzex = F3DZEX(prefix=prefix)
+    f3dzex.loaddisplaylists(os.path.join(fpath, "displaylists.txt"))
+    if loadOtherSegments:
+        log.debug('Loading other segments')
+        f3dzex.loadOtherSegments(filepath)
+
+    if importType == "ROOM":
+        log.debug('Importing room')
+        f3dzex.loadSegment(0x03, filepath)
+        f3dzex.importMap()
+    else:
+        log.debug('Importing object')
+        f3dzex.loadSegment(0x06, filepath)
+        f3dzex.importObj()
+    return f3dzex
+
+def parse_object(path, options=None, prefix=""):
+    """
+    Read an object file (.zobj) into the intermediate representation, see parseFile
+    """
+    return parseFile(path, "OBJECT", options, prefix)
+
+def parse_room(path, options=None, prefix=""):
+    """
+    Read a room file (.zroom, .zmap) into the intermediate representation, see parseFile
+    """
+    return parseFile(path, "ROOM", options, prefix)